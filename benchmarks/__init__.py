@@ -0,0 +1,12 @@
+"""Нагрузочные замеры приложения posts.
+
+Запуск из корня репозитория::
+
+    python -m benchmarks run --posts 100000 --output results.json
+    python -m benchmarks compare old.json new.json
+    python -m benchmarks concurrency --readers 8 --writers 2 [--plain]
+    python -m benchmarks sessions --requests 500
+    python -m benchmarks templates --renders 500
+    python -m benchmarks cards --renders 1000
+    python -m benchmarks asgi --clients 64 --threads 16
+"""
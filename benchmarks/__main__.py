@@ -0,0 +1,265 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from . import environment
+
+
+def commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=environment.ROOT, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    database = environment.setup(args.database)
+    from . import dataset, runner
+
+    if args.database is None or args.seed_data:
+        sizes = dataset.seed(
+            users=args.users, groups=args.groups, posts=args.posts,
+            comments=args.comments, follows_per_user=args.follows,
+            alpha=args.alpha, seed=args.seed,
+        )
+    else:
+        sizes = None
+    report = {
+        'meta': {
+            'commit': commit(),
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': database,
+            'dataset': sizes,
+            'requests': args.requests,
+            'cache': 'warm' if args.warm else 'cold',
+        },
+        'results': runner.run(
+            requests=args.requests, warm=args.warm, seed=args.seed,
+            views=args.views,
+        ),
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+
+def concurrency(args):
+    database = environment.setup(args.database, plain=args.plain)
+    from . import concurrency, dataset
+
+    if args.database is None:
+        dataset.seed(users=args.users, posts=args.posts, seed=args.seed)
+    report = {
+        'meta': {
+            'commit': commit(),
+            'database': database,
+            'backend': 'plain' if args.plain else 'tuned',
+            'readers': args.readers,
+            'writers': args.writers,
+        },
+        'results': concurrency.run(
+            readers=args.readers, writers=args.writers,
+            seconds=args.seconds, seed=args.seed,
+        ),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def sessions(args):
+    database = environment.setup(args.database)
+    from . import dataset, sessions
+
+    if args.database is None:
+        dataset.seed(users=args.users, posts=args.posts, seed=args.seed)
+    report = {
+        'meta': {
+            'commit': commit(),
+            'database': database,
+            'requests': args.requests,
+        },
+        'results': sessions.run(requests=args.requests),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def templates(args):
+    database = environment.setup(args.database)
+    from . import dataset, templates
+
+    if args.database is None:
+        dataset.seed(users=args.users, posts=args.posts, seed=args.seed)
+    report = {
+        'meta': {
+            'commit': commit(),
+            'database': database,
+            'renders': args.renders,
+        },
+        'results': templates.run(renders=args.renders),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def cards(args):
+    database = environment.setup(args.database)
+    from . import cards, dataset
+
+    if args.database is None:
+        dataset.seed(users=args.users, posts=args.posts, seed=args.seed)
+    report = {
+        'meta': {
+            'commit': commit(),
+            'database': database,
+            'renders': args.renders,
+        },
+        'results': cards.run(renders=args.renders),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def asgi(args):
+    database = environment.setup(args.database)
+    from . import asgi, dataset
+
+    if args.database is None:
+        dataset.seed(users=args.users, posts=args.posts, seed=args.seed)
+    report = {
+        'meta': {
+            'commit': commit(),
+            'database': database,
+            'clients': args.clients,
+            'threads': args.threads,
+        },
+        'results': asgi.run(
+            requests=args.requests, clients=args.clients,
+            threads=args.threads, seed=args.seed,
+        ),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+def compare(args):
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)['results']
+    with open(args.candidate, encoding='utf-8') as file:
+        candidate = json.load(file)['results']
+    regressions = 0
+    for view in sorted(set(baseline) & set(candidate)):
+        old = baseline[view]['latency_ms']['p95']
+        new = candidate[view]['latency_ms']['p95']
+        change = (new - old) / old if old else 0
+        queries = (candidate[view]['queries']['p95']
+                   - baseline[view]['queries']['p95'])
+        flag = ''
+        if change > args.threshold or queries > 0:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f'{view:<14} p95 {old:8.2f} -> {new:8.2f} ms '
+              f'({change:+.1%}), queries p95 {queries:+d}{flag}')
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Замер view posts.')
+    run_parser.add_argument('--database', help='Готовая база SQLite.')
+    run_parser.add_argument('--seed-data', action='store_true',
+                            help='Заполнить и базу из --database.')
+    run_parser.add_argument('--users', type=int, default=1000)
+    run_parser.add_argument('--groups', type=int, default=20)
+    run_parser.add_argument('--posts', type=int, default=10000)
+    run_parser.add_argument('--comments', type=int, default=20000)
+    run_parser.add_argument('--follows', type=int, default=20,
+                            help='Среднее число подписок на пользователя.')
+    run_parser.add_argument('--alpha', type=float, default=1.2,
+                            help='Показатель степенного закона подписок.')
+    run_parser.add_argument('--requests', type=int, default=200)
+    run_parser.add_argument('--warm', action='store_true',
+                            help='Не сбрасывать кэш между запросами.')
+    run_parser.add_argument('--views', nargs='*')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser(
+        'compare', help='Сравнение двух прогонов.'
+    )
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='Допустимый рост p95, доля.')
+    compare_parser.set_defaults(handler=compare)
+
+    concurrency_parser = commands.add_parser(
+        'concurrency', help='Конкурентные чтение и запись.'
+    )
+    concurrency_parser.add_argument('--database', help='Готовая база SQLite.')
+    concurrency_parser.add_argument('--plain', action='store_true',
+                                    help='Стандартный бэкенд без прагм.')
+    concurrency_parser.add_argument('--users', type=int, default=200)
+    concurrency_parser.add_argument('--posts', type=int, default=2000)
+    concurrency_parser.add_argument('--readers', type=int, default=8)
+    concurrency_parser.add_argument('--writers', type=int, default=2)
+    concurrency_parser.add_argument('--seconds', type=float, default=10)
+    concurrency_parser.add_argument('--seed', type=int, default=0)
+    concurrency_parser.set_defaults(handler=concurrency)
+
+    sessions_parser = commands.add_parser(
+        'sessions', help='Стоимость сессии и аутентификации.'
+    )
+    sessions_parser.add_argument('--database', help='Готовая база SQLite.')
+    sessions_parser.add_argument('--users', type=int, default=200)
+    sessions_parser.add_argument('--posts', type=int, default=2000)
+    sessions_parser.add_argument('--requests', type=int, default=500)
+    sessions_parser.add_argument('--seed', type=int, default=0)
+    sessions_parser.set_defaults(handler=sessions)
+
+    templates_parser = commands.add_parser(
+        'templates', help='Рендеринг ленты с кэшем шаблонов и без.'
+    )
+    templates_parser.add_argument('--database', help='Готовая база SQLite.')
+    templates_parser.add_argument('--users', type=int, default=50)
+    templates_parser.add_argument('--posts', type=int, default=200)
+    templates_parser.add_argument('--renders', type=int, default=500)
+    templates_parser.add_argument('--seed', type=int, default=0)
+    templates_parser.set_defaults(handler=templates)
+
+    cards_parser = commands.add_parser(
+        'cards', help='Карточки ленты: include против post_cards.'
+    )
+    cards_parser.add_argument('--database', help='Готовая база SQLite.')
+    cards_parser.add_argument('--users', type=int, default=50)
+    cards_parser.add_argument('--posts', type=int, default=200)
+    cards_parser.add_argument('--renders', type=int, default=1000)
+    cards_parser.add_argument('--seed', type=int, default=0)
+    cards_parser.set_defaults(handler=cards)
+
+    asgi_parser = commands.add_parser(
+        'asgi', help='Конкурентные запросы лент под WSGI и ASGI.'
+    )
+    asgi_parser.add_argument('--database', help='Готовая база SQLite.')
+    asgi_parser.add_argument('--users', type=int, default=200)
+    asgi_parser.add_argument('--posts', type=int, default=2000)
+    asgi_parser.add_argument('--requests', type=int, default=2000)
+    asgi_parser.add_argument('--clients', type=int, default=64)
+    asgi_parser.add_argument('--threads', type=int, default=16)
+    asgi_parser.add_argument('--seed', type=int, default=0)
+    asgi_parser.set_defaults(handler=asgi)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
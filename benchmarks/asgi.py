@@ -0,0 +1,145 @@
+"""Пропускная способность ленты под WSGI и ASGI.
+
+clients конкурентных клиентов запрашивают ленты index, group_posts,
+profile и follow_index от имени подписчика. WSGI-режим — пул из
+threads потоков, как у многопоточного WSGI-сервера, ASGI-режим —
+корутины в цикле событий поверх BoundedWsgiToAsgi с пулом того же
+размера. Задержка в обоих режимах считается с ожиданием свободного
+потока. Запросы идут в процессе, без сети, поэтому разница — это
+цена планирования запросов, а не разбора HTTP.
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+
+from core.asgi import BoundedWsgiToAsgi
+from core.metrics import percentile
+from posts.models import Follow
+
+from .runner import scenarios
+
+VIEWS = ('index', 'group_posts', 'profile', 'follow_index')
+
+
+def _urls(requests, seed):
+    rng = random.Random(seed)
+    urls = scenarios(rng, pages=5)
+    return [urls[rng.choice(VIEWS)]() for _ in range(requests)]
+
+
+def _cookie():
+    client = Client()
+    client.force_login(Follow.objects.order_by('id').first().user)
+    return '; '.join(
+        f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+    )
+
+
+def _wsgi_request(handler, url, cookie):
+    path = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path.path,
+        'QUERY_STRING': path.query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'testserver',
+        'HTTP_COOKIE': cookie,
+        'wsgi.input': BytesIO(),
+        'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers: statuses.append(
+        status
+    ))
+    b''.join(response)
+    response.close()
+    assert statuses[0].startswith('200'), statuses[0]
+
+
+async def _asgi_request(application, url, cookie):
+    path = urlsplit(url)
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    begin = time.perf_counter()
+    await application({
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'path': path.path,
+        'query_string': path.query.encode(),
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'server': ('testserver', 80),
+    }, receive, send)
+    assert messages[0]['status'] == 200, messages[0]['status']
+    return (time.perf_counter() - begin) * 1000
+
+
+def _summary(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+        },
+    }
+
+
+def _wsgi(handler, urls, cookie, clients, threads):
+    server = ThreadPoolExecutor(threads, thread_name_prefix='wsgi')
+
+    def client(url):
+        begin = time.perf_counter()
+        server.submit(_wsgi_request, handler, url, cookie).result()
+        return (time.perf_counter() - begin) * 1000
+
+    with server, ThreadPoolExecutor(clients) as executor:
+        started = time.perf_counter()
+        latencies = list(executor.map(client, urls))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+def _asgi(handler, urls, cookie, clients, threads):
+    application = BoundedWsgiToAsgi(handler, threads=threads)
+    queue = list(reversed(urls))
+
+    async def client(latencies):
+        while queue:
+            latencies.append(
+                await _asgi_request(application, queue.pop(), cookie)
+            )
+
+    async def main():
+        latencies = []
+        started = time.perf_counter()
+        await asyncio.gather(*(client(latencies) for _ in range(clients)))
+        return _summary(latencies, time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def run(requests=2000, clients=64, threads=16, seed=0):
+    """Прогоняет одни и те же URL в обоих режимах."""
+    handler = get_wsgi_application()
+    urls = _urls(requests, seed)
+    cookie = _cookie()
+    results = {}
+    for name, mode in (('wsgi', _wsgi), ('asgi', _asgi)):
+        cache.clear()
+        results[name] = mode(handler, urls, cookie, clients, threads)
+    return results
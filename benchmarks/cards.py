@@ -0,0 +1,103 @@
+"""Микрозамер карточек ленты: {% include %} в цикле против {% post_cards %}.
+
+Прежние шаблоны карточки и картинки воспроизведены ниже и загружаются
+кэширующим загрузчиком, так что оба варианта разбираются один раз.
+Замеры идут с тёплым кэшем фрагментов и с пустым, когда каждая
+карточка рендерится заново.
+"""
+import time
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template import Context, Engine
+
+from core.metrics import percentile
+from posts.models import Post
+
+INCLUDE_CARD = '''{% load cache %}
+<article>
+  {% cache 86400 post_card post.id post.updated group.pk %}
+      <ul>
+        <li>Автор: {{ post.author.username }}</li>
+        <li>Дата публикации: {{ post.pub_date|date:"d E Y" }}</li>
+    {% include 'post_image.html' %}
+    <p class="text-break">{{ post.text }}</p>
+    <a href="{% url 'posts:post_detail' post.id %}">подробная информация</a>
+    {% if not group and post.group %}
+    <a href="{% url 'posts:group_list' post.group.slug %}">все записи группы</a>
+    {% endif %}
+  {% endcache %}
+    {% if not forloop.last %}<hr>{% endif %}
+</article>'''  # noqa: E501
+INCLUDE_IMAGE = '''{% if post.thumbnail %}
+  {% with srcset=post.srcset size=post.thumbnail_size %}
+  <picture>
+    {% if srcset.webp %}
+    <source type="image/webp" srcset="{{ srcset.webp }}" sizes="(max-width: 992px) 100vw, 960px">
+    {% endif %}
+    <img class="card-img my-2" src="{{ post.thumbnail.url }}"
+         {% if srcset.jpeg %}srcset="{{ srcset.jpeg }}" sizes="(max-width: 992px) 100vw, 960px"{% endif %}
+         {% if size %}width="{{ size.0 }}" height="{{ size.1 }}"{% endif %}
+         loading="lazy" decoding="async" alt="">
+  </picture>
+  {% endwith %}
+{% elif post.image %}
+  <img class="card-img my-2" src="{{ post.image.url }}" loading="lazy" alt="">
+{% endif %}'''  # noqa: E501
+PAGES = {
+    'include': '''{% for post in page_obj %}
+{% include 'card_post.html' %}
+{% endfor %}''',
+    'post_cards': '''{% load post_cards %}{% post_cards page_obj as cards %}
+{% for card in cards %}
+{{ card }}{% if not forloop.last %}<hr>{% endif %}
+{% endfor %}''',
+}
+
+
+def _engine():
+    return Engine(
+        loaders=[('django.template.loaders.cached.Loader', [
+            ('django.template.loaders.locmem.Loader', {
+                'card_post.html': INCLUDE_CARD,
+                'post_image.html': INCLUDE_IMAGE,
+                **{f'{name}.html': page for name, page in PAGES.items()},
+            }),
+        ])],
+        libraries={
+            'cache': 'django.templatetags.cache',
+            'post_cards': 'core.templatetags.post_cards',
+        },
+    )
+
+
+def _summary(latencies):
+    return {
+        'mean': round(sum(latencies) / len(latencies), 3),
+        'p50': round(percentile(latencies, 0.5), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+    }
+
+
+def run(renders=1000, per_page=10):
+    """Рендерит страницу карточек renders раз каждым способом."""
+    posts = Post.objects.select_related('author', 'group')
+    page = Paginator(posts, per_page).get_page(1)
+    list(page)
+    engine = _engine()
+    results = {}
+    for name in PAGES:
+        template = engine.get_template(f'{name}.html')
+        results[name] = {}
+        for fragments in ('warm', 'cold'):
+            cache.clear()
+            template.render(Context({'page_obj': page}))
+            latencies = []
+            for _ in range(renders):
+                if fragments == 'cold':
+                    cache.clear()
+                begin = time.perf_counter()
+                template.render(Context({'page_obj': page}))
+                latencies.append((time.perf_counter() - begin) * 1000)
+            results[name][fragments] = _summary(latencies)
+    return results
@@ -0,0 +1,97 @@
+"""Конкурентные чтение и запись в одну базу SQLite.
+
+Потоки-читатели выбирают страницу ленты и комментарии случайного
+поста, потоки-писатели добавляют комментарии, как add_comment. Каждая
+операция обрамляется close_old_connections, как запрос в WSGIHandler,
+поэтому без CONN_MAX_AGE соединение открывается заново на каждую
+операцию. Ошибки «database is locked» считаются отдельно.
+"""
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, close_old_connections, connection
+
+from core.metrics import percentile
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+def _read(rng, post_ids):
+    list(Post.objects.select_related('author', 'group')[:10])
+    list(Comment.objects.filter(post_id=rng.choice(post_ids))[:20])
+
+
+def _write(rng, post_ids, user_ids):
+    Comment.objects.create(
+        post_id=rng.choice(post_ids),
+        author_id=rng.choice(user_ids),
+        text='benchmark',
+    )
+
+
+def _worker(operation, deadline, seed, stats, lock):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        close_old_connections()
+        begin = time.perf_counter()
+        try:
+            operation(rng)
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append((time.perf_counter() - begin) * 1000)
+        close_old_connections()
+    connection.close()
+    with lock:
+        stats['latencies'].extend(latencies)
+        stats['errors'] += errors
+
+
+def _summary(stats, elapsed):
+    latencies = stats['latencies']
+    return {
+        'operations': len(latencies),
+        'ops': round(len(latencies) / elapsed, 2),
+        'errors': stats['errors'],
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+        } if latencies else None,
+    }
+
+
+def run(readers=8, writers=2, seconds=10, seed=0):
+    """Гоняет потоки seconds секунд и возвращает сводку."""
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+    connection.close()
+    lock = threading.Lock()
+    stats = {
+        'reads': {'latencies': [], 'errors': 0},
+        'writes': {'latencies': [], 'errors': 0},
+    }
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=_worker, args=(
+            lambda rng: _read(rng, post_ids),
+            deadline, seed + i, stats['reads'], lock,
+        ))
+        for i in range(readers)
+    ] + [
+        threading.Thread(target=_worker, args=(
+            lambda rng: _write(rng, post_ids, user_ids),
+            deadline, seed + readers + i, stats['writes'], lock,
+        ))
+        for i in range(writers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {name: _summary(value, elapsed) for name, value in stats.items()}
@@ -0,0 +1,30 @@
+"""Генерация набора данных заданного размера.
+
+Данные создаёт команда seed_posts: тексты из Faker, степенной граф
+подписок, где популярность автора убывает как 1 / rank ** alpha,
+поэтому у немногих авторов много подписчиков.
+"""
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from posts.models import Comment, Follow, Group, Post
+
+
+def seed(users=1000, groups=20, posts=10000, comments=20000,
+         follows_per_user=20, alpha=1.2, days=365, seed=0):
+    """Заполняет пустую базу и возвращает размеры набора."""
+    call_command(
+        'seed_posts', users=users, groups=groups, posts=posts,
+        comments=comments, follows=follows_per_user, alpha=alpha,
+        days=days, seed=seed, stdout=io.StringIO(),
+    )
+    return {
+        'users': get_user_model().objects.count(),
+        'groups': Group.objects.count(),
+        'posts': Post.objects.count(),
+        'comments': Comment.objects.count(),
+        'follows': Follow.objects.count(),
+        'seed': seed,
+    }
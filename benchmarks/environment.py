@@ -0,0 +1,50 @@
+"""Изолированное окружение Django для замеров.
+
+База и кэш создаются во временном каталоге, чтобы замеры не трогали
+рабочие данные и не зависели от их состояния.
+"""
+import atexit
+import logging
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'yatube')
+
+
+def setup(database=None, plain=False):
+    """Настраивает Django и возвращает путь к базе замеров.
+
+    plain=True подключает стандартный бэкенд SQLite без прагм и без
+    постоянных соединений — для сравнения с настроенным.
+    """
+    if PROJECT not in sys.path:
+        sys.path.insert(0, PROJECT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    import django
+    from django.conf import settings
+
+    workdir = tempfile.mkdtemp(prefix='yatube-bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+    database = database or os.path.join(workdir, 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = database
+    if plain:
+        settings.DATABASES['default'].update(
+            ENGINE='django.db.backends.sqlite3', CONN_MAX_AGE=0
+        )
+    settings.CACHES['default']['LOCATION'] = os.path.join(
+        workdir, 'cache.sqlite3'
+    )
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    django.setup()
+    logging.getLogger('core.metrics').disabled = True
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, interactive=False)
+    if plain:
+        from django.db import connection
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode = DELETE')
+    return database
@@ -0,0 +1,87 @@
+"""Прогон view через тестовый клиент Django и сбор статистики."""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from core import metrics
+from core.metrics import percentile
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+def scenarios(rng, pages):
+    """Генераторы URL для каждого view."""
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    slugs = list(Group.objects.values_list('slug', flat=True))
+    authors = list(User.objects.filter(
+        posts__isnull=False
+    ).distinct().values_list('username', flat=True))
+
+    def page():
+        return f'?page={rng.randint(1, pages)}'
+
+    return {
+        'index': lambda: reverse('posts:index') + page(),
+        'group_posts': lambda: reverse(
+            'posts:group_list', args=[rng.choice(slugs)]
+        ) + page(),
+        'profile': lambda: reverse(
+            'posts:profile', args=[rng.choice(authors)]
+        ),
+        'post_detail': lambda: reverse(
+            'posts:post_detail', args=[rng.choice(post_ids)]
+        ),
+        'follow_index': lambda: reverse('posts:follow_index') + page(),
+    }
+
+
+def summarize(latencies, queries, elapsed):
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+        },
+        'queries': {
+            'p50': percentile(queries, 0.5),
+            'p95': percentile(queries, 0.95),
+            'max': max(queries),
+        },
+    }
+
+
+def run(requests=200, warm=False, pages=5, seed=0, views=None):
+    """Прогоняет каждый view requests раз и возвращает сводку."""
+    rng = random.Random(seed)
+    reader = User.objects.filter(
+        id__in=Follow.objects.values('user')
+    ).order_by('id').first()
+    client = Client()
+    client.force_login(reader)
+    results = {}
+    for name, url in scenarios(rng, pages).items():
+        if views and name not in views:
+            continue
+        cache.clear()
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(requests):
+            if not warm:
+                cache.clear()
+            begin = time.perf_counter()
+            response = client.get(url())
+            latencies.append((time.perf_counter() - begin) * 1000)
+            assert response.status_code == 200, response.status_code
+            queries.append(metrics.records[-1]['queries'])
+        results[name] = summarize(
+            latencies, queries, time.perf_counter() - started
+        )
+    return results
@@ -0,0 +1,72 @@
+"""Стоимость сессии и аутентификации на запрос.
+
+Одна и та же закэшированная страница запрашивается анонимно
+и авторизованно при двух настройках: сессии в базе с ModelBackend
+и подписанная cookie с CachedModelBackend. Страница берётся из кэша,
+поэтому запросы к базе — это только сессия и пользователь.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.metrics import percentile
+
+User = get_user_model()
+
+CONFIGS = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend'
+        ],
+    },
+    'signed_cookie': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'AUTHENTICATION_BACKENDS': ['core.auth.CachedModelBackend'],
+    },
+}
+
+
+def _measure(client, url, requests):
+    client.get(url)
+    latencies, queries = [], []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            begin = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - begin) * 1000)
+        assert response.status_code == 200, response.status_code
+        queries.append(len(captured))
+    return {
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+        },
+        'queries': {
+            'mean': round(sum(queries) / len(queries), 2),
+            'max': max(queries),
+        },
+    }
+
+
+def run(requests=500):
+    """Замеряет каждую настройку анонимно и авторизованно."""
+    user = User.objects.order_by('id').first()
+    url = reverse('posts:index')
+    results = {}
+    for name, options in CONFIGS.items():
+        with override_settings(**options):
+            cache.clear()
+            authorized = Client()
+            authorized.force_login(user)
+            results[name] = {
+                'anonymous': _measure(Client(), url, requests),
+                'authorized': _measure(authorized, url, requests),
+            }
+    return results
@@ -0,0 +1,74 @@
+"""Время рендеринга страницы ленты из 10 карточек.
+
+Сравниваются загрузчики без кэша, которые читают и разбирают
+base.html и include на каждый рендер, и кэширующий загрузчик после
+warm_up. Для кэша отдельно замеряется первый рендер без прогрева.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from core.metrics import percentile
+from core.template_backend import warm_up
+from posts.models import Post
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def _templates(loaders):
+    options = dict(settings.TEMPLATES[0]['OPTIONS'], loaders=loaders)
+    return [dict(settings.TEMPLATES[0], OPTIONS=options)]
+
+
+def _render(request, context):
+    begin = time.perf_counter()
+    render_to_string('posts/index.html', context, request)
+    return (time.perf_counter() - begin) * 1000
+
+
+def _summary(latencies):
+    return {
+        'mean': round(sum(latencies) / len(latencies), 3),
+        'p50': round(percentile(latencies, 0.5), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+    }
+
+
+def run(renders=500):
+    """Рендерит страницу renders раз при каждой настройке."""
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    posts = Post.objects.select_related('author', 'group')
+    context = {'page_obj': Paginator(posts, 10).get_page(1)}
+    list(context['page_obj'])
+    uncached = _templates(LOADERS)
+    cached = _templates([('django.template.loaders.cached.Loader', LOADERS)])
+    results = {}
+    with override_settings(TEMPLATES=uncached):
+        first = _render(request, context)
+        results['uncached'] = {
+            'first_ms': round(first, 3),
+            **_summary([_render(request, context) for _ in range(renders)]),
+        }
+    with override_settings(TEMPLATES=cached):
+        first = _render(request, context)
+    with override_settings(TEMPLATES=cached):
+        begin = time.perf_counter()
+        warm_up()
+        warm_up_ms = (time.perf_counter() - begin) * 1000
+        warmed = _render(request, context)
+        results['cached'] = {
+            'first_ms': round(first, 3),
+            'warm_up_ms': round(warm_up_ms, 3),
+            'first_after_warm_up_ms': round(warmed, 3),
+            **_summary([_render(request, context) for _ in range(renders)]),
+        }
+    return results
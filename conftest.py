@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def test_environment():
+    from core.test_runner import test_environment
+
+    with test_environment():
+        yield
@@ -0,0 +1,179 @@
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from posts import archive
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_LIMIT=2)
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'test-post-{i}', group=cls.group
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_index_payload_and_cursor(self):
+        response = self.client.get(reverse('api:index'))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[2].pk, self.posts[1].pk],
+        )
+        self.assertEqual(data['results'][0]['author'], 'author')
+        self.assertEqual(data['results'][0]['group'], 'test-slug')
+        self.assertIsNone(data['previous'])
+        data = self.client.get(
+            reverse('api:index'), {'cursor': data['next']}
+        ).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']], [self.posts[0].pk]
+        )
+        self.assertIsNone(data['next'])
+
+    def test_malformed_cursor(self):
+        urls = (
+            reverse('api:index'),
+            reverse('api:post_detail', kwargs={'post_id': self.posts[0].pk}),
+        )
+        for url in urls:
+            for raw in ('n|abc|1', 'n|2020-13-45T00:00:00|1'):
+                cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+                with self.subTest(url=url, raw=raw):
+                    response = self.client.get(url, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+
+    def test_conditional_get(self):
+        url = reverse('api:group_list', kwargs={'slug': 'test-slug'})
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_ignored_after_delete(self):
+        url = reverse('api:profile', kwargs={'username': 'author'})
+        since = http_date(timezone.now().timestamp() + 60)
+        Post.objects.filter(pk=self.posts[2].pk).delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(
+            self.posts[2].pk,
+            [post['id'] for post in response.json()['results']],
+        )
+
+    def test_archived_posts(self):
+        old = self.posts[0]
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        Comment.objects.create(post=old, author=self.user, text='old')
+        archive.archive(timezone.now() - timedelta(days=30))
+        url = reverse('api:profile', kwargs={'username': 'author'})
+        first = self.client.get(url).json()
+        second = self.client.get(url, {'cursor': first['next']}).json()
+        self.assertEqual(
+            [post['id'] for post in first['results'] + second['results']],
+            [self.posts[2].pk, self.posts[1].pk, old.pk],
+        )
+        data = self.client.get(
+            reverse('api:post_detail', kwargs={'post_id': old.pk})
+        ).json()
+        self.assertTrue(data['archived'])
+        self.assertEqual(data['text'], old.text)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['old'],
+        )
+
+    def test_etag_changes_on_edit_and_comment(self):
+        url = reverse(
+            'api:post_detail', kwargs={'post_id': self.posts[0].pk}
+        )
+        first = self.client.get(url)['ETag']
+        post = Post.objects.get(pk=self.posts[0].pk)
+        post.text = 'edited'
+        post.save()
+        second = self.client.get(url)
+        self.assertNotEqual(second['ETag'], first)
+        self.assertEqual(second.json()['text'], 'edited')
+        Comment.objects.create(post=post, author=self.user, text='hi')
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.json()['comments_count'], 1)
+        self.assertEqual(third.json()['comments']['results'][0]['text'], 'hi')
+
+    def test_not_found(self):
+        cases = (
+            reverse('api:group_list', kwargs={'slug': 'missing'}),
+            reverse('api:profile', kwargs={'username': 'missing'}),
+            reverse('api:post_detail', kwargs={'post_id': 0}),
+        )
+        for url in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('detail', response.json())
+
+    def test_follow_index(self):
+        response = self.client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+        url = reverse('api:follow_index')
+        self.assertEqual(
+            self.authorized_client.get(url).json()['results'], []
+        )
+        Follow.objects.create(user=self.user, author=self.author)
+        data = self.authorized_client.get(url).json()
+        self.assertEqual(len(data['results']), settings.POSTS_LIMIT)
+        data = self.authorized_client.get(url, {'cursor': data['next']})
+        self.assertEqual(
+            [post['id'] for post in data.json()['results']],
+            [self.posts[0].pk],
+        )
+
+    def test_errors_have_no_etag(self):
+        cases = (
+            reverse('api:follow_index'),
+            reverse('api:post_detail', kwargs={'post_id': 0}),
+        )
+        for url in cases:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotIn('ETag', response)
+                replay = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(replay.status_code, response.status_code)
+
+    def test_read_only(self):
+        response = self.authorized_client.post(reverse('api:index'))
+        self.assertEqual(response.status_code, 405)
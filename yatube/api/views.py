@@ -0,0 +1,187 @@
+"""Read-only JSON API лент для мобильных клиентов.
+
+Строки выбираются через values() только с нужными колонками,
+страницы листаются курсором (?cursor=). Ответы поддерживают
+условный GET: ETag меняется вместе с версиями тегов кэша страниц,
+поэтому неизменная лента отдаётся кодом 304 без выборки постов.
+Last-Modified не отдаётся: удаление поста не сдвигает ни одну дату.
+Архивные посты отдаются наравне с живыми, как и в HTML-ленте.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.views.decorators.http import require_safe
+
+from posts import archive, feed
+from posts.cache import (
+    AUTHOR_TAG, FOLLOWING_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, etag
+)
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post
+)
+from posts.paginator import COMMENT_ORDERING, SeekPaginator
+
+User = get_user_model()
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'image', 'thumbnail')
+POST_RELATED = {
+    'author_name': F('author__username'),
+    'group_slug': F('group__slug'),
+}
+COMMENT_FIELDS = ('id', 'text', 'created')
+COMMENT_RELATED = {
+    'author_name': F('author__username'),
+}
+
+
+def _url(name):
+    return default_storage.url(name) if name else None
+
+
+def _post(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': row['author_name'],
+        'group': row['group_slug'],
+        'image': _url(row['image']),
+        'thumbnail': _url(row['thumbnail']),
+    }
+
+
+def _comment(row):
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': row['author_name'],
+    }
+
+
+def _page(request, queryset, serialize, per_page, **kwargs):
+    page = SeekPaginator(queryset, per_page, **kwargs).get_page(
+        request.GET.get('cursor')
+    )
+    return {
+        'results': [serialize(row) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+def _feed_response(request, queryset):
+    return JsonResponse(_page(
+        request,
+        queryset.values(*POST_FIELDS, **POST_RELATED),
+        _post,
+        settings.POSTS_LIMIT,
+    ))
+
+
+def _not_found():
+    return JsonResponse({'detail': 'Не найдено.'}, status=404)
+
+
+def _conditional(request, tags, build):
+    """Ответ 304 по ETag тегов или JSON, собранный build().
+
+    Вызывается, когда view уже нашла объект и проверила авторизацию,
+    поэтому ответы 401 и 404 ETag не получают.
+    """
+    tag_etag = quote_etag(etag(request, tags))
+    response = get_conditional_response(request, etag=tag_etag)
+    if response is None:
+        response = build()
+    response['ETag'] = tag_etag
+    return response
+
+
+@require_safe
+def index(request):
+    return _conditional(
+        request, [INDEX_TAG],
+        lambda: _feed_response(request, Post.objects.all()),
+    )
+
+
+@require_safe
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).only('id').first()
+    if group is None:
+        return _not_found()
+    return _conditional(
+        request, [GROUP_TAG.format(slug=slug)],
+        lambda: _feed_response(request, group.posts.all()),
+    )
+
+
+@require_safe
+def profile(request, username):
+    author = User.objects.filter(username=username).only('id').first()
+    if author is None:
+        return _not_found()
+    return _conditional(
+        request, [AUTHOR_TAG.format(username=username)],
+        lambda: _feed_response(request, archive.PostChain(
+            author.posts.all(), author.archived_posts.all()
+        )),
+    )
+
+
+def _post_detail(request, post_id, model, comments, row):
+    data = _post(row)
+    data['archived'] = model is ArchivedPost
+    data['comments_count'] = row['comments_count']
+    data['comments'] = _page(
+        request,
+        comments.objects.filter(post_id=post_id).values(
+            *COMMENT_FIELDS, **COMMENT_RELATED
+        ),
+        _comment,
+        settings.COMMENTS_LIMIT,
+        ordering=COMMENT_ORDERING,
+    )
+    return JsonResponse(data)
+
+
+@require_safe
+def post_detail(request, post_id):
+    for model, comments in (
+        (Post, Comment), (ArchivedPost, ArchivedComment)
+    ):
+        row = model.objects.filter(pk=post_id).values(
+            'comments_count', *POST_FIELDS, **POST_RELATED
+        ).first()
+        if row is not None:
+            break
+    else:
+        return _not_found()
+    return _conditional(
+        request, [POST_TAG.format(post_id=post_id)],
+        lambda: _post_detail(request, post_id, model, comments, row),
+    )
+
+
+@require_safe
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Требуется авторизация.'}, status=401
+        )
+    return _conditional(
+        request,
+        [INDEX_TAG, FOLLOWING_TAG.format(user_id=request.user.pk)],
+        lambda: JsonResponse(_page(
+            request,
+            feed.timeline(request.user).values(
+                *POST_FIELDS, 'feed_date', 'feed_post', **POST_RELATED
+            ),
+            _post,
+            settings.POSTS_LIMIT,
+            ordering=feed.TIMELINE_ORDERING,
+        )),
+    )
@@ -0,0 +1,48 @@
+"""ASGI-обёртка WSGI-приложения с ограниченным пулом потоков.
+
+В Django 2.2 нет асинхронных view и асинхронного ORM, поэтому
+запрос целиком выполняется синхронно в потоке, как под WSGI-сервером.
+Потоки берутся из пула на ASGI_THREADS потоков, который ставится
+исполнителем по умолчанию в цикле событий сервера. Так число
+одновременных запросов к SQLite и открытых соединений ограничено,
+а ожидающие соединения клиентов держит цикл событий, не потоки.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi
+from django.conf import settings
+
+
+class BoundedWsgiToAsgi(WsgiToAsgi):
+    def __init__(self, wsgi_application, threads=None):
+        super().__init__(wsgi_application)
+        self.threads = threads or settings.ASGI_THREADS
+        self.executors = {}
+
+    def executor(self, loop):
+        """Пул потоков цикла loop, создаётся при первом запросе."""
+        if loop not in self.executors:
+            self.executors[loop] = ThreadPoolExecutor(
+                self.threads, thread_name_prefix='asgi'
+            )
+            loop.set_default_executor(self.executors[loop])
+        return self.executors[loop]
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for executor in self.executors.values():
+                    executor.shutdown(wait=True)
+                self.executors.clear()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        self.executor(asyncio.get_running_loop())
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,56 @@
+"""Бэкенд аутентификации с кэшем пользователя запроса.
+
+Сессии хранятся в подписанной cookie, поэтому для анонимного
+запроса нет ни одного обращения к базе, а авторизованный берёт
+пользователя из общего кэша. Запись кэша сбрасывается при сохранении
+и удалении пользователя, в том числе при смене пароля и входе.
+
+В кэше лежат только поля без хеша пароля и готовый хеш сессии;
+пароль у восстановленного пользователя отложен и читается из базы
+лишь при обращении. Массовый update() сигналов не шлёт, поэтому
+блокировка через него действует не позже AUTH_USER_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+User = get_user_model()
+
+USER_KEY = 'auth:user:{user_id}'
+
+
+def _pack(user):
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in user._meta.concrete_fields
+        if field.attname != 'password'
+    }
+    return user._state.db, fields, user.get_session_auth_hash()
+
+
+def _unpack(entry):
+    db, fields, session_hash = entry
+    user = User.from_db(db, list(fields), list(fields.values()))
+    user.get_session_auth_hash = lambda: session_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id=user_id)
+        entry = cache.get(key)
+        if entry is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, _pack(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        return _unpack(entry)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    cache.delete(USER_KEY.format(user_id=instance.pk))
@@ -0,0 +1,275 @@
+"""Кэш в файле SQLite, общий для всех процессов на одном хосте.
+
+В отличие от LocMemCache каждый воркер gunicorn видит одни и те же
+записи. Вытеснение — LRU по времени последнего обращения, с лимитами
+на число записей (MAX_ENTRIES) и суммарный размер (MAX_SIZE, байт).
+Запись идёт в транзакциях BEGIN IMMEDIATE, база работает в режиме WAL.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL,'
+    ' accessed REAL NOT NULL, size INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    'CREATE TABLE IF NOT EXISTS stats ('
+    ' name TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+)
+STATS = ('hits', 'misses', 'entries', 'size')
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.location = location
+        self.max_size = int(options.get('MAX_SIZE', 256 * 1024 * 1024))
+        self.lru_resolution = float(options.get('LRU_RESOLUTION', 10))
+        self.stats_flush = int(options.get('STATS_FLUSH', 100))
+        self.busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = {'hits': 0, 'misses': 0}
+
+    @property
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self.location)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.location,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def _write(self, func, *args):
+        connection = self._connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = func(connection, *args)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return result
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _count(self, hits=0, misses=0):
+        with self._lock:
+            self._pending['hits'] += hits
+            self._pending['misses'] += misses
+            total = self._pending['hits'] + self._pending['misses']
+            if total < self.stats_flush:
+                return
+            pending, self._pending = self._pending, {'hits': 0, 'misses': 0}
+        self._write(self._add_stats, pending)
+
+    @staticmethod
+    def _add_stats(connection, deltas):
+        for name, delta in deltas.items():
+            if delta:
+                connection.execute(
+                    'INSERT INTO stats (name, value) VALUES (?, ?) '
+                    'ON CONFLICT (name) DO UPDATE SET value = value + ?',
+                    (name, delta, delta),
+                )
+
+    def _store(self, connection, key, value, expires, only_new=False):
+        now = time.time()
+        row = connection.execute(
+            'SELECT size, expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if only_new and row and (row[1] is None or row[1] > now):
+            return False
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        connection.execute(
+            'INSERT OR REPLACE INTO cache'
+            ' (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)',
+            (key, data, expires, now, len(data)),
+        )
+        old_size = row[0] if row else 0
+        self._add_stats(connection, {
+            'entries': 0 if row else 1,
+            'size': len(data) - old_size,
+        })
+        self._cull(connection)
+        return True
+
+    def _remove(self, connection, keys):
+        removed = 0
+        for key in keys:
+            row = connection.execute(
+                'SELECT size FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                continue
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+            self._add_stats(connection, {'entries': -1, 'size': -row[0]})
+            removed += 1
+        return removed
+
+    def _cull(self, connection):
+        totals = dict(connection.execute(
+            "SELECT name, value FROM stats WHERE name IN ('entries', 'size')"
+        ).fetchall())
+        entries = totals.get('entries', 0)
+        size = totals.get('size', 0)
+        if entries <= self._max_entries and size <= self.max_size:
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?',
+            (time.time(),),
+        )
+        connection.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+            'ORDER BY accessed LIMIT ?)',
+            (max(entries // self._cull_frequency, 1),),
+        )
+        count, size = connection.execute(
+            'SELECT COUNT(*), TOTAL(size) FROM cache'
+        ).fetchone()
+        connection.execute(
+            "INSERT OR REPLACE INTO stats (name, value) VALUES "
+            "('entries', ?), ('size', ?)", (count, int(size)),
+        )
+
+    def _fetch(self, keys):
+        placeholders = ', '.join('?' * len(keys))
+        return self._connection.execute(
+            f'SELECT key, value, expires, accessed FROM cache '
+            f'WHERE key IN ({placeholders})', keys
+        ).fetchall()
+
+    def _read(self, keys):
+        now = time.time()
+        found, expired, stale = {}, [], []
+        for key, value, expires, accessed in self._fetch(keys):
+            if expires is not None and expires <= now:
+                expired.append(key)
+                continue
+            found[key] = pickle.loads(value)
+            if now - accessed > self.lru_resolution:
+                stale.append(key)
+        if expired:
+            self._write(self._remove, expired)
+        if stale:
+            self._write(lambda connection: connection.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ?',
+                [(now, key) for key in stale],
+            ))
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._read([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        if not keys:
+            return {}
+        cache_keys = {self._key(key, version): key for key in keys}
+        found = self._read(list(cache_keys))
+        return {cache_keys[key]: value for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expires = self.get_backend_timeout(timeout)
+        self._write(self._store, key, value, expires)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        return self._write(
+            self._store, key, value, self.get_backend_timeout(timeout), True
+        )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        items = [(self._key(key, version), value)
+                 for key, value in data.items()]
+
+        def store_all(connection):
+            for key, value in items:
+                self._store(connection, key, value, expires)
+        self._write(store_all)
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expires = self.get_backend_timeout(timeout)
+        return bool(self._write(lambda connection: connection.execute(
+            'UPDATE cache SET expires = ? WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (expires, key, time.time()),
+        ).rowcount))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+
+        def increment(connection):
+            row = connection.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= time.time()):
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            connection.execute(
+                'UPDATE cache SET value = ?, size = ? WHERE key = ?',
+                (data, len(data), key),
+            )
+            self._add_stats(connection, {'size': len(data) - len(row[0])})
+            return value
+        return self._write(increment)
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        return bool(self._write(self._remove, [key]))
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        self._write(self._remove, keys)
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._connection.execute(
+            'SELECT expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        return row is not None and (row[0] is None or row[0] > time.time())
+
+    def clear(self):
+        def wipe(connection):
+            connection.execute('DELETE FROM cache')
+            connection.execute('DELETE FROM stats')
+        self._write(wipe)
+
+    def stats(self):
+        """Счётчики попаданий, промахов, числа и объёма записей."""
+        with self._lock:
+            pending, self._pending = self._pending, {'hits': 0, 'misses': 0}
+        self._write(self._add_stats, pending)
+        values = dict(self._connection.execute(
+            'SELECT name, value FROM stats'
+        ).fetchall())
+        return {name: values.get(name, 0) for name in STATS}
+
+    def close(self, **kwargs):
+        pass
@@ -0,0 +1,41 @@
+"""Бэкенд SQLite, настроенный на конкурентные чтение и запись.
+
+При открытии соединения выполняются прагмы PRAGMAS: журнал WAL
+позволяет читать во время записи, synchronous=NORMAL делает fsync
+только на контрольных точках, mmap и увеличенный кэш страниц
+сокращают системные вызовы, а busy_timeout заставляет ждать
+блокировку вместо ошибки «database is locked». Прагмы переопределяются
+в OPTIONS['pragmas'].
+
+Транзакции atomic() начинаются с BEGIN IMMEDIATE: блокировка записи
+берётся сразу, и конкурирующая транзакция ждёт её в busy_timeout.
+При обычном BEGIN SQLite не ждёт, если транзакции с прочитанными
+данными нужно перейти к записи, и сразу возвращает ошибку.
+"""
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE')
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
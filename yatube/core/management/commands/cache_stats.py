@@ -0,0 +1,20 @@
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику общего кэша.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('alias', nargs='?', default='default')
+
+    def handle(self, *args, alias, **options):
+        cache = caches[alias]
+        if not hasattr(cache, 'stats'):
+            raise CommandError(f'Кэш {alias} не ведёт статистику.')
+        stats = cache.stats()
+        requests = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / requests if requests else 0
+        for name, value in stats.items():
+            self.stdout.write(f'{name}: {value}')
+        self.stdout.write(f'hit ratio: {ratio:.2%}')
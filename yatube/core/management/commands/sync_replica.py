@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу в реплики через backup API SQLite. '
+        'Читатели реплики видят прежнее состояние до конца копирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Алиасы реплик, по умолчанию DATABASE_REPLICAS.',
+        )
+
+    def handle(self, *args, aliases, **options):
+        aliases = aliases or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Реплики не настроены.')
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        for alias in aliases:
+            if alias == DEFAULT_DB_ALIAS or alias not in settings.DATABASES:
+                raise CommandError(f'{alias} — не реплика.')
+            target = connections[alias]
+            target.ensure_connection()
+            source.connection.backup(target.connection)
+            self.stdout.write(f'База скопирована в {alias}.')
@@ -0,0 +1,65 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.metrics import percentile
+
+COLUMNS = (
+    'view', 'n', 'p50 ms', 'p95 ms', 'p50 q', 'p95 q',
+    'p95 db ms', 'p95 tpl ms', 'hit %',
+)
+
+
+class Command(BaseCommand):
+    help = 'Сводка p50/p95 по view из журнала метрик.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.METRICS_LOG)
+
+    def read(self, path):
+        try:
+            with open(path, encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(entry, dict) and entry.get('view'):
+                        yield entry
+        except FileNotFoundError:
+            raise CommandError(f'Журнал метрик {path} не найден.')
+
+    def handle(self, *args, log, **options):
+        views = defaultdict(list)
+        for entry in self.read(log):
+            views[entry['view']].append(entry)
+        rows = [COLUMNS]
+        for view, entries in sorted(views.items()):
+            total = [entry['total_time'] * 1000 for entry in entries]
+            queries = [entry['queries'] for entry in entries]
+            cached = [entry['cache'] for entry in entries if entry['cache']]
+            hits = cached.count('hit') / len(cached) if cached else 0
+            rows.append((
+                view,
+                len(entries),
+                f'{percentile(total, 0.5):.1f}',
+                f'{percentile(total, 0.95):.1f}',
+                percentile(queries, 0.5),
+                percentile(queries, 0.95),
+                '%.1f' % percentile(
+                    [entry['db_time'] * 1000 for entry in entries], 0.95
+                ),
+                '%.1f' % percentile(
+                    [entry['template_time'] * 1000 for entry in entries],
+                    0.95
+                ),
+                f'{hits:.0%}' if cached else '-',
+            ))
+        widths = [max(len(str(row[i])) for row in rows)
+                  for i in range(len(COLUMNS))]
+        for row in rows:
+            self.stdout.write('  '.join(
+                str(value).ljust(width) for value, width in zip(row, widths)
+            ))
@@ -0,0 +1,76 @@
+"""Метрики запросов: число SQL-запросов, время БД, шаблонов и кэш.
+
+Последние записи хранятся в кольцевом буфере процесса и пишутся
+строками JSON в логгер core.metrics для команды view_report.
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger('core.metrics')
+
+records = deque(maxlen=settings.METRICS_BUFFER_SIZE)
+
+_local = threading.local()
+
+
+class QueryBudgetExceeded(Exception):
+    """View выполнил больше SQL-запросов, чем разрешено бюджетом."""
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def current():
+    """Метрики текущего запроса или None вне запроса."""
+    return getattr(_local, 'metrics', None)
+
+
+def activate(metrics):
+    _local.metrics = metrics
+
+
+def deactivate():
+    _local.metrics = None
+
+
+def record(entry):
+    records.append(entry)
+    logger.info(json.dumps(entry, ensure_ascii=False))
+    budget = settings.QUERY_BUDGETS.get(entry['view'])
+    if budget is None or entry['queries'] <= budget:
+        return
+    message = (
+        f"{entry['view']}: {entry['queries']} SQL-запросов "
+        f"при бюджете {budget}"
+    )
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def percentile(values, fraction):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
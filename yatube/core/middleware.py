@@ -0,0 +1,62 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, routers
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL-запросы, время БД и шаблонов для каждого view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        metrics.activate(request_metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate()
+        match = request.resolver_match
+        metrics.record({
+            'view': match.view_name if match else None,
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': request_metrics.queries,
+            'db_time': round(request_metrics.db_time, 6),
+            'template_time': round(request_metrics.template_time, 6),
+            'total_time': round(time.perf_counter() - start, 6),
+            'cache': getattr(request, 'page_cache', None),
+        })
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет за клиентом default после записи в базу."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.reset()
+        response = self.get_response(request)
+        if routers.wrote() and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        routers.reset()
+        return response
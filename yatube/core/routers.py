@@ -0,0 +1,72 @@
+"""Чтение лент с реплик базы.
+
+Запись всегда идёт в default. View, помеченные read_from_replica,
+читают со случайной реплики из DATABASE_REPLICAS. После любой записи
+ReplicaPinMiddleware ставит cookie, и следующие
+DATABASE_REPLICA_PIN_SECONDS секунд клиент читает из default: так
+автор сразу видит свои посты, комментарии и подписки, даже если
+реплика ещё не догнала основную базу (см. команду sync_replica).
+"""
+import random
+import threading
+from functools import wraps
+
+from django.conf import settings
+
+PIN_COOKIE = 'pin_primary'
+
+_local = threading.local()
+
+
+def replica():
+    """Алиас реплики, с которой читает текущий view, или None."""
+    return getattr(_local, 'replica', None)
+
+
+def wrote():
+    """Была ли запись в базу за время текущего запроса."""
+    return getattr(_local, 'wrote', False)
+
+
+def reset():
+    _local.replica = None
+    _local.wrote = False
+
+
+def read_from_replica(view):
+    """Направляет чтения GET-запроса view на реплику.
+
+    Клиенты с cookie PIN_COOKIE читают из default. Сессия
+    и пользователь загружаются из default до переключения, иначе
+    отставшая реплика «разлогинит» нового пользователя.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            not settings.DATABASE_REPLICAS
+            or request.method not in ('GET', 'HEAD')
+            or PIN_COOKIE in request.COOKIES
+        ):
+            return view(request, *args, **kwargs)
+        request.user.is_authenticated
+        _local.replica = random.choice(settings.DATABASE_REPLICAS)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _local.replica = None
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replica()
+
+    def db_for_write(self, model, **hints):
+        _local.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
@@ -0,0 +1,70 @@
+import os
+import time
+from fnmatch import fnmatch
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        request_metrics = metrics.current()
+        if request_metrics is None or request_metrics.rendering:
+            return super().render(context, request)
+        request_metrics.rendering = True
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            request_metrics.template_time += time.perf_counter() - start
+            request_metrics.rendering = False
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, замеряющий время рендеринга шаблонов."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self
+        )
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+def _template_names(engine):
+    for loader in engine.template_loaders:
+        for child in getattr(loader, 'loaders', [loader]):
+            for directory in child.get_dirs():
+                for root, _, files in os.walk(directory):
+                    for name in files:
+                        path = os.path.join(root, name)
+                        yield os.path.relpath(path, directory).replace(
+                            os.sep, '/'
+                        )
+
+
+def warm_up(patterns=None):
+    """Компилирует шаблоны по маскам TEMPLATE_WARMUP заранее.
+
+    Вызывается при старте воркера: скомпилированные шаблоны попадают
+    в кэш загрузчика, и первые запросы не читают и не разбирают файлы.
+    Возвращает имена скомпилированных шаблонов.
+    """
+    patterns = settings.TEMPLATE_WARMUP if patterns is None else patterns
+    compiled = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        names = sorted({
+            name for name in _template_names(backend.engine)
+            if any(fnmatch(name, pattern) for pattern in patterns)
+        })
+        for name in names:
+            backend.engine.get_template(name)
+        compiled.extend(names)
+    return compiled
@@ -0,0 +1,113 @@
+"""Карточки постов ленты, отрендеренные одним тегом.
+
+{% post_cards page_obj as cards %} заменяет {% include %} карточки
+в цикле: ссылки строятся подстановкой в один заранее развёрнутый
+reverse() на маршрут, фрагменты карточек читаются из кэша одним
+get_many, а разметка собирается format_html без рендеринга шаблонов.
+Шаблону остаётся вывести готовые карточки циклом.
+"""
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.defaultfilters import date
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+
+register = template.Library()
+
+CARD_TIMEOUT = 60 * 60 * 24
+SIZES = '(max-width: 992px) 100vw, 960px'
+PK_PLACEHOLDER = 2147483647
+SLUG_PLACEHOLDER = 'slug-placeholder'
+
+
+def _url_template(name, placeholder):
+    url = reverse(name, args=[placeholder])
+    return lambda value: url.replace(str(placeholder), str(value), 1)
+
+
+@register.simple_tag
+def post_image(post):
+    """Картинка поста: миниатюры WebP и JPEG со srcset или оригинал.
+
+    Оригинал выводится, пока миниатюры нет: она строится в фоне и для
+    старых постов или после сбоя задачи может не появиться вовсе.
+    """
+    if post.thumbnail:
+        srcset = post.srcset
+        size = post.thumbnail_size
+        return format_html(
+            '<picture>{}<img class="card-img my-2" src="{}"{}{} '
+            'loading="lazy" decoding="async" alt=""></picture>',
+            format_html(
+                '<source type="image/webp" srcset="{}" sizes="{}">',
+                srcset['webp'], SIZES,
+            ) if srcset.get('webp') else '',
+            post.thumbnail.url,
+            format_html(
+                ' srcset="{}" sizes="{}"', srcset['jpeg'], SIZES
+            ) if srcset.get('jpeg') else '',
+            format_html(
+                ' width="{}" height="{}"', *size
+            ) if size else '',
+        )
+    if post.image:
+        return format_html(
+            '<img class="card-img my-2" src="{}" loading="lazy" alt="">',
+            post.image.url,
+        )
+    return ''
+
+
+def _card(post, group, post_url, group_url):
+    group_link = ''
+    if group is None and post.group is not None:
+        group_link = format_html(
+            '<a href="{}">все записи группы</a>', group_url(post.group.slug)
+        )
+    return format_html(
+        '<ul><li>Автор: {}</li><li>Дата публикации: {}</li></ul>'
+        '{}<p class="text-break">{}</p>'
+        '<a href="{}">подробная информация</a>{}',
+        post.author.username,
+        date(template_localtime(post.pub_date), 'd E Y'),
+        post_image(post),
+        post.text,
+        post_url(post.id),
+        group_link,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Список HTML-карточек постов с кэшем фрагментов на сутки.
+
+    Фрагмент карточки зависит от даты изменения поста и от того,
+    открыта ли страница группы: там ссылка на группу не нужна.
+    """
+    posts = list(posts)
+    group = context.get('group')
+    group_pk = getattr(group, 'pk', None)
+    keys = [
+        make_template_fragment_key(
+            'post_card', [post.id, post.updated, group_pk]
+        )
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    post_url = _url_template('posts:post_detail', PK_PLACEHOLDER)
+    group_url = _url_template('posts:group_list', SLUG_PLACEHOLDER)
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            cards[key] = missing[key] = _card(
+                post, group, post_url, group_url
+            )
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+    return [
+        format_html('<article>{}</article>', mark_safe(cards[key]))
+        for key in keys
+    ]
@@ -0,0 +1,72 @@
+"""Запуск тестов в отдельном окружении.
+
+Тесты чистят кэш и оставляют в нём версии тегов и страницы, поэтому
+на время прогона кэш переносится во временный каталог: рабочий кэш
+сервера не трогается, а прогоны не зависят друг от друга. Журнал
+метрик в файл не пишется, а превышение бюджета SQL-запросов
+(QUERY_BUDGETS) роняет тест.
+"""
+import logging.config
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from copy import deepcopy
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+@contextmanager
+def isolated_cache():
+    """Переносит все кэши CACHES во временный каталог."""
+    directory = tempfile.mkdtemp(prefix='yatube-test-cache-')
+    caches = {
+        alias: {
+            **options,
+            'LOCATION': os.path.join(directory, f'{alias}.sqlite3'),
+        }
+        for alias, options in settings.CACHES.items()
+    }
+    try:
+        with override_settings(CACHES=caches):
+            yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@contextmanager
+def quiet_metrics():
+    """Отключает запись журнала метрик в файл.
+
+    Настройка подменяется и в LOGGING: django.setup() при создании
+    WSGI-приложения в тестах применяет её заново.
+    """
+    config = deepcopy(settings.LOGGING)
+    config['handlers']['metrics'] = {'class': 'logging.NullHandler'}
+    try:
+        with override_settings(LOGGING=config):
+            logging.config.dictConfig(config)
+            yield
+    finally:
+        logging.config.dictConfig(settings.LOGGING)
+
+
+@contextmanager
+def test_environment():
+    with isolated_cache(), quiet_metrics(), override_settings(
+        QUERY_BUDGET_STRICT=True
+    ):
+        yield
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_environment = test_environment()
+        self._test_environment.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_environment.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
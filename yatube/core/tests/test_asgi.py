@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.test import TransactionTestCase
+
+from posts.models import Post
+
+from ..asgi import BoundedWsgiToAsgi
+
+User = get_user_model()
+
+
+class BoundedWsgiToAsgiTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        Post.objects.create(
+            author=User.objects.create_user(username='author'),
+            text='asgi-post',
+        )
+        self.threads = []
+        handler = get_wsgi_application()
+
+        def wsgi_application(environ, start_response):
+            self.threads.append(threading.current_thread().name)
+            return handler(environ, start_response)
+
+        self.application = BoundedWsgiToAsgi(wsgi_application, threads=2)
+
+    async def request(self, path):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        await self.application({
+            'type': 'http',
+            'http_version': '1.1',
+            'method': 'GET',
+            'path': path,
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+        }, receive, send)
+        return messages[0]['status'], b''.join(
+            message.get('body', b'') for message in messages[1:]
+        )
+
+    async def lifespan(self, *messages):
+        incoming = asyncio.Queue()
+        for message in messages:
+            incoming.put_nowait({'type': message})
+        sent = []
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await self.application({'type': 'lifespan'}, incoming.get, send)
+        return sent
+
+    def test_serves_requests_in_bounded_pool(self):
+        async def main():
+            responses = await asyncio.gather(
+                *(self.request('/') for _ in range(6))
+            )
+            executor = self.application.executors[asyncio.get_running_loop()]
+            return responses, executor._max_workers
+
+        responses, max_workers = asyncio.run(main())
+        for status, body in responses:
+            self.assertEqual(status, 200)
+            self.assertIn(b'asgi-post', body)
+        self.assertEqual(max_workers, 2)
+        self.assertEqual(len(self.threads), 6)
+        self.assertTrue(all(name.startswith('asgi') for name in self.threads))
+        self.assertLessEqual(len(set(self.threads)), 2)
+
+    def test_lifespan(self):
+        sent = asyncio.run(
+            self.lifespan('lifespan.startup', 'lifespan.shutdown')
+        )
+        self.assertEqual(
+            sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        )
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow
+
+from ..auth import USER_KEY
+
+User = get_user_model()
+
+
+class SessionAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_profile(self):
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['following'])
+        self.assertFalse(any(
+            'django_session' in query['sql'] for query in queries
+        ))
+
+    def test_following(self):
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.authorized_client.get(
+            reverse('posts:profile', kwargs={'username': 'author'})
+        )
+        self.assertTrue(response.context['following'])
+
+    def test_cached_page_without_queries(self):
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.authorized_client.get(url)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_user_save_resets_cache(self):
+        self.authorized_client.get(reverse('posts:index'))
+        key = USER_KEY.format(user_id=self.user.pk)
+        self.assertIsNotNone(cache.get(key))
+        self.user.first_name = 'renamed'
+        self.user.save()
+        self.assertIsNone(cache.get(key))
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(response.wsgi_request.user.first_name, 'renamed')
+
+    def test_cache_has_no_password_hash(self):
+        self.authorized_client.get(reverse('posts:index'))
+        entry = cache.get(USER_KEY.format(user_id=self.user.pk))
+        self.assertNotIn(self.user.password, repr(entry))
+        response = self.authorized_client.get(reverse('posts:index'))
+        cached = response.wsgi_request.user
+        cached.first_name = 'renamed'
+        cached.save()
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.first_name, 'renamed')
+        self.assertEqual(user.password, self.user.password)
+
+    def test_bulk_deactivation_waits_for_timeout(self):
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.authorized_client.get(url)
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        # Запись истекает через AUTH_USER_CACHE_TIMEOUT.
+        cache.delete(USER_KEY.format(user_id=self.user.pk))
+        response = self.authorized_client.get(url)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from ..cache import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return SQLiteCache(
+            os.path.join(self.directory, 'cache.sqlite3'),
+            {'OPTIONS': {'STATS_FLUSH': 1, **options}},
+        )
+
+    def test_shared_between_instances(self):
+        self.cache.set('key', {'value': 1})
+        self.assertEqual(self.make_cache().get('key'), {'value': 1})
+
+    def test_add_incr_delete(self):
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        self.assertTrue(self.cache.delete('counter'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('counter')
+
+    def test_expired_entry_is_miss(self):
+        self.cache.set('key', 'value', timeout=-1)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.has_key('key'))
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(
+            MAX_ENTRIES=3, CULL_FREQUENCY=3, LRU_RESOLUTION=0
+        )
+        for index in range(3):
+            cache.set(f'key-{index}', index)
+        cache.get('key-0')
+        cache.set('key-3', 3)
+        self.assertIsNone(cache.get('key-1'))
+        self.assertEqual(cache.get('key-0'), 0)
+        self.assertEqual(cache.stats()['entries'], 3)
+
+    def test_stats(self):
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('missing')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['entries'], 1)
+
+
+class TestCacheLocationTests(SimpleTestCase):
+    def test_tests_do_not_share_server_cache(self):
+        server_location = os.path.join(
+            settings.BASE_DIR, 'cache', 'cache.sqlite3'
+        )
+        self.assertNotEqual(cache.location, server_location)
+        self.assertTrue(cache.location.startswith(tempfile.gettempdir()))
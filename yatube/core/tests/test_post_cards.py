@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, text=f'<b>post-{i}</b>', group=cls.group
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, **context):
+        return Template(
+            '{% load post_cards %}{% post_cards posts as cards %}'
+            '{% for card in cards %}{{ card }}{% endfor %}'
+        ).render(Context({'posts': self.posts, **context}))
+
+    def test_cards(self):
+        html = self.render()
+        self.assertEqual(html.count('<article>'), 3)
+        self.assertIn('&lt;b&gt;post-0&lt;/b&gt;', html)
+        for post in self.posts:
+            with self.subTest(post=post.id):
+                self.assertIn(
+                    reverse('posts:post_detail', args=[post.id]), html
+                )
+        self.assertIn(reverse('posts:group_list', args=['test-slug']), html)
+
+    def test_group_page_without_group_link(self):
+        html = self.render(group=self.group)
+        self.assertNotIn(
+            reverse('posts:group_list', args=['test-slug']), html
+        )
+
+    def test_fragments_cached(self):
+        self.render()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.render().count('<article>'), 3)
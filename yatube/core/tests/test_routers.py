@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import AuthorStats, Post
+
+from ..routers import PIN_COOKIE
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(author=self.author, text='synced')
+        call_command('sync_replica', stdout=StringIO())
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(
+            User.objects.create_user(username='reader')
+        )
+
+    def texts(self, client, url):
+        response = client.get(url)
+        return [post.text for post in response.context['page_obj']]
+
+    def test_reads_lagging_replica(self):
+        Post.objects.create(author=self.author, text='not-synced')
+        self.assertEqual(self.texts(self.client, '/'), ['synced'])
+        call_command('sync_replica', stdout=StringIO())
+        cache.clear()
+        self.assertEqual(
+            self.texts(self.client, '/'), ['not-synced', 'synced']
+        )
+
+    def test_read_your_writes(self):
+        response = self.author_client.post(
+            reverse('posts:post_create'), {'text': 'own-post'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIn('own-post', self.texts(self.author_client, url))
+                self.assertNotIn(
+                    'own-post', self.texts(self.reader_client, url)
+                )
+
+    def test_profile_of_new_user(self):
+        User.objects.create_user(username='newcomer')
+        call_command('sync_replica', stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'newcomer'})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts_count'], 0)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_stats_recount_reads_default(self):
+        AuthorStats.objects.filter(user=self.author).delete()
+        call_command('sync_replica', stdout=StringIO())
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['author_stats'].posts_count, 1)
+
+    def test_reads_do_not_pin(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_go_to_default(self):
+        self.author_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            {'text': 'comment'},
+        )
+        self.assertEqual(self.post.comments.using('default').count(), 1)
+        self.assertEqual(self.post.comments.using('replica').count(), 0)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from ..template_backend import warm_up
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_warm_up_fills_loader_cache(self):
+        with override_settings(TEMPLATES=settings.TEMPLATES):
+            names = warm_up()
+            for name in (
+                'base.html',
+                'includes/header.html',
+                'posts/index.html',
+                'posts/includes/paginator.html',
+            ):
+                with self.subTest(name=name):
+                    self.assertIn(name, names)
+            self.assertNotIn('users/login.html', names)
+            loader = engines.all()[0].engine.template_loaders[0]
+            self.assertLessEqual(set(names), set(loader.get_template_cache))
@@ -0,0 +1,211 @@
+"""Потоковая загрузка картинок с ранними проверками.
+
+Обработчик пишет файл во временный файл на диске, как
+TemporaryFileUploadHandler, но уже по первым блокам проверяет
+сигнатуру формата и размеры картинки из заголовка, а при превышении
+IMAGE_UPLOAD_MAX_SIZE прекращает чтение запроса. PNG, WebP и GIF,
+в отличие от JPEG, нельзя декодировать в уменьшенном масштабе, поэтому
+для них число пикселей ограничено IMAGE_DECODE_MAX_PIXELS. Отклонённый
+файл попадает в request.FILES как RejectedUpload с текстом ошибки,
+который форма показывает пользователю.
+
+Обработчик ставится только на view загрузки картинок декоратором
+image_uploads, остальные загрузки идут через обработчики Django.
+"""
+from functools import wraps
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    StopUpload, TemporaryFileUploadHandler
+)
+from django.http import HttpResponse, QueryDict
+from django.template.defaultfilters import filesizeformat
+from django.utils.datastructures import MultiValueDict
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image, ImageOps
+
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+HEADER_LIMIT = 256 * 1024
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 90},
+}
+FORMAT_ERROR = 'Загрузите картинку в формате JPEG, PNG, GIF или WebP.'
+
+
+def sniff(header):
+    """Формат картинки по сигнатуре или None."""
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    for signature, image_format in SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+class RejectedUpload(UploadedFile):
+    """Пустой файл на месте отклонённой загрузки."""
+
+    def __init__(self, name, content_type, error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.upload_error = error
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.too_large = False
+        self.stopped = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        """Отказывает в разборе тела, которое заведомо больше лимита."""
+        limit = settings.IMAGE_UPLOAD_MAX_SIZE + (
+            settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        )
+        if content_length > limit:
+            self.too_large = True
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.error = None
+        self.header = b''
+        self.inspected = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is not None:
+            return None
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_SIZE:
+            self.reject(
+                f'Файл больше '
+                f'{filesizeformat(settings.IMAGE_UPLOAD_MAX_SIZE)}.'
+            )
+            self.stopped = RejectedUpload(
+                self.file_name, self.content_type, self.error
+            )
+            raise StopUpload(connection_reset=True)
+        if not self.inspected:
+            self.header += raw_data[:HEADER_LIMIT - len(self.header)]
+            self.inspect(final=False)
+            if self.error is not None:
+                return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def inspect(self, final):
+        """Проверяет сигнатуру и размеры по заголовку картинки.
+
+        Image.open читает только заголовок, пиксели не декодируются.
+        Пока заголовок не дочитан, проверка откладывается до
+        следующего блока.
+        """
+        if len(self.header) < 12 and not final:
+            return
+        image_format = sniff(self.header)
+        if image_format is None:
+            self.reject(FORMAT_ERROR)
+            return
+        try:
+            width, height = Image.open(BytesIO(self.header)).size
+        except Image.DecompressionBombError:
+            width = height = None
+        except Exception:
+            if final or len(self.header) >= HEADER_LIMIT:
+                self.reject('Не удалось прочитать размеры картинки.')
+            return
+        self.inspected = True
+        self.header = b''
+        limit = settings.IMAGE_UPLOAD_MAX_SIDE
+        if width is None or width > limit or height > limit:
+            self.reject(f'Картинка больше {limit}×{limit} пикселей.')
+            return
+        pixels = settings.IMAGE_DECODE_MAX_PIXELS
+        if image_format != 'JPEG' and width * height > pixels:
+            self.reject(
+                f'Картинка {image_format} больше '
+                f'{pixels / 1e6:.0f} млн пикселей.'
+            )
+
+    def reject(self, error):
+        self.error = error
+        self.inspected = True
+        self.header = b''
+        self.file.close()
+        return None
+
+    def file_complete(self, file_size):
+        if not self.inspected:
+            self.inspect(final=True)
+        if self.error is not None:
+            return RejectedUpload(
+                self.file_name, self.content_type, self.error
+            )
+        return super().file_complete(file_size)
+
+
+def image_uploads(view):
+    """Декоратор view, принимающего картинки через ImageUploadHandler.
+
+    Обработчик должен стоять до чтения тела запроса, поэтому CSRF
+    проверяется уже после этого, как советует документация Django.
+    Тело больше лимита отклоняется кодом 413 без чтения.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        handler = ImageUploadHandler(request)
+        request.upload_handlers = [handler]
+        if request.method == 'POST':
+            request.POST  # тело разбирается уже новым обработчиком
+            if handler.too_large:
+                return HttpResponse(
+                    'Запрос слишком большой.', status=413
+                )
+            if handler.stopped is not None:
+                request.FILES.appendlist(handler.field_name, handler.stopped)
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def strip_metadata(upload):
+    """Перекодирует картинку без EXIF и прочих метаданных.
+
+    Поворот из EXIF применяется к пикселям. JPEG декодируется сразу
+    в уменьшенном масштабе (draft), если он больше
+    IMAGE_STORED_MAX_SIDE. Результат держится в памяти, пока не
+    превысит FILE_UPLOAD_MAX_MEMORY_SIZE, затем уходит на диск.
+    GIF возвращается без изменений: в нём нет EXIF, а перекодирование
+    потеряло бы анимацию.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    image_format = image.format
+    if image_format not in SAVE_OPTIONS:
+        upload.seek(0)
+        return upload
+    limit = settings.IMAGE_STORED_MAX_SIDE
+    image.draft('RGB', (limit, limit))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((limit, limit), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    output = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE,
+        dir=settings.FILE_UPLOAD_TEMP_DIR,
+    )
+    image.save(output, image_format, **SAVE_OPTIONS[image_format])
+    size = output.tell()
+    output.seek(0)
+    return UploadedFile(output, upload.name, upload.content_type, size)
@@ -0,0 +1,149 @@
+"""Архив старых постов.
+
+Посты старше POST_ARCHIVE_AFTER_DAYS переносятся вместе с
+комментариями в таблицы ArchivedPost и ArchivedComment, поэтому
+горячая таблица posts_post и её индексы содержат только свежие записи.
+Архивные посты открываются по прежним ссылкам в post_detail
+и показываются в профиле после живых (см. PostChain).
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from . import counters, search
+from .cache import AUTHOR_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, bump
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post, TimelineEntry
+)
+
+User = get_user_model()
+
+ARCHIVE_BATCH_SIZE = 500
+POST_COLUMNS = (
+    'id', 'text', 'pub_date', 'updated', 'author_id', 'group_id', 'image',
+    'thumbnail', 'image_variants', 'comments_count',
+)
+COMMENT_COLUMNS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def _delete(model, column, ids):
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {model._meta.db_table} '
+            f'WHERE {column} IN ({placeholders})',
+            ids,
+        )
+
+
+def _move(ids):
+    posts = list(Post.objects.filter(pk__in=ids).values(*POST_COLUMNS))
+    ArchivedPost.objects.bulk_create(ArchivedPost(**row) for row in posts)
+    ArchivedComment.objects.bulk_create(
+        ArchivedComment(**row)
+        for row in Comment.objects.filter(post_id__in=ids).values(
+            *COMMENT_COLUMNS
+        ).iterator()
+    )
+    # Удаление в обход сигналов: счётчики автора не меняются,
+    # архивные посты остаются его постами.
+    _delete(TimelineEntry, 'post_id', ids)
+    _delete(Comment, 'post_id', ids)
+    _delete(Post, 'id', ids)
+    search.remove(*ids)
+    groups = Counter(row['group_id'] for row in posts)
+    for group_id, count in groups.items():
+        counters.update_group(group_id, -count)
+    bump(
+        INDEX_TAG,
+        *(POST_TAG.format(post_id=pk) for pk in ids),
+        *(AUTHOR_TAG.format(username=name) for name in User.objects.filter(
+            pk__in={row['author_id'] for row in posts}
+        ).values_list('username', flat=True)),
+        *(GROUP_TAG.format(slug=slug) for slug in Group.objects.filter(
+            pk__in=[pk for pk in groups if pk is not None]
+        ).values_list('slug', flat=True)),
+    )
+
+
+def archive(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Переносит в архив посты, опубликованные раньше before.
+
+    Каждая пачка переносится в своей транзакции. Возвращает число
+    перенесённых постов.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Post.objects.filter(pub_date__lt=before).order_by(
+                    'pub_date', 'id'
+                ).values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            _move(ids)
+        total += len(ids)
+
+
+class PostChain:
+    """Живые посты, за которыми идут архивные, как одна лента.
+
+    Архивные посты всегда старше живых, поэтому при сортировке
+    по убыванию даты архив просто продолжает живую ленту. Поддерживает
+    count() и срезы для Paginator, filter(), order_by() и values()
+    для SeekPaginator и API.
+    """
+
+    def __init__(self, live, archived):
+        self.live = live
+        self.archived = archived
+        self._first_count = None
+
+    def _parts(self):
+        if tuple(self.live.query.order_by)[:1] in ((), ('-pub_date',)):
+            return self.live, self.archived
+        return self.archived, self.live
+
+    def filter(self, *args, **kwargs):
+        return PostChain(
+            self.live.filter(*args, **kwargs),
+            self.archived.filter(*args, **kwargs),
+        )
+
+    def order_by(self, *fields):
+        return PostChain(
+            self.live.order_by(*fields), self.archived.order_by(*fields)
+        )
+
+    def values(self, *fields, **expressions):
+        return PostChain(
+            self.live.values(*fields, **expressions),
+            self.archived.values(*fields, **expressions),
+        )
+
+    def count(self):
+        return self.live.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        first, second = self._parts()
+        start = index.start or 0
+        items = list(first[start:index.stop])
+        if index.stop is not None and len(items) == index.stop - start:
+            return items
+        if items:
+            offset = 0
+        else:
+            if self._first_count is None:
+                self._first_count = first.count()
+            offset = start - self._first_count
+        stop = None if index.stop is None else offset + (
+            index.stop - start - len(items)
+        )
+        return items + list(second[offset:stop])
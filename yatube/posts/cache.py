@@ -0,0 +1,167 @@
+"""Версионный кэш страниц с инвалидацией по тегам.
+
+Каждый тег (лента, группа, автор, пост) хранит в кэше свою версию.
+Ключ закэшированной страницы содержит версии всех её тегов, поэтому
+смена версии тега мгновенно делает устаревшими все зависящие страницы,
+а сами страницы можно хранить долго.
+
+Те же версии дают ETag ответа: браузер или обратный прокси получают
+304 без рендеринга и без чтения страницы из кэша.
+"""
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+    quote_etag
+)
+
+from core import routers
+
+from .models import ArchivedPost, Post
+
+INDEX_TAG = 'index'
+GROUP_TAG = 'group:{slug}'
+AUTHOR_TAG = 'author:{username}'
+POST_TAG = 'post:{post_id}'
+FOLLOWING_TAG = 'following:{user_id}'
+POST_AUTHOR_KEY = 'post:author:{post_id}'
+
+
+def _version_key(tag):
+    return 'tag:' + hashlib.md5(tag.encode()).hexdigest()
+
+
+def tag_versions(tags):
+    """Текущие версии тегов; отсутствующим назначается новая версия."""
+    keys = [_version_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(*tags):
+    """Инвалидирует все страницы, помеченные любым из тегов."""
+    cache.set_many(
+        {_version_key(tag): uuid4().hex for tag in tags if tag}, None
+    )
+
+
+def post_author_tag(request, post_id):
+    """AUTHOR_TAG автора поста или None, если поста нет.
+
+    Страница поста показывает число постов автора, поэтому зависит
+    и от его тега. Имя автора кэшируется на FEED_CACHE_TIMEOUT, сигналы
+    сохранения поста кладут его заранее.
+    """
+    key = POST_AUTHOR_KEY.format(post_id=post_id)
+    username = cache.get(key)
+    if username is None:
+        for model in (Post, ArchivedPost):
+            username = model.objects.filter(pk=post_id).values_list(
+                'author__username', flat=True
+            ).first()
+            if username is not None:
+                break
+        else:
+            return None
+        cache.set(key, username, settings.FEED_CACHE_TIMEOUT)
+    return AUTHOR_TAG.format(username=username)
+
+
+def _format_tags(request, tag_templates, kwargs):
+    tags = (
+        template(request, **kwargs) if callable(template)
+        else template.format(user_id=request.user.pk, **kwargs)
+        for template in tag_templates
+    )
+    return [tag for tag in tags if tag]
+
+
+def etag(request, tags):
+    """ETag ответа: меняется вместе с версией любого из тегов.
+
+    Страницы, прочитанные с реплики, отличаются от прочитанных из
+    default, чтобы автор не получил чужую копию без своей записи.
+    """
+    versions = ':'.join(tag_versions(tags))
+    database = routers.replica() or 'default'
+    raw = f'{request.get_full_path()}:{request.user.pk}:{database}:{versions}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _validated(request, response, tag_etag):
+    """Добавляет к кэшируемому ответу ETag и Cache-Control.
+
+    Анонимные страницы разрешено хранить общим кэшам на
+    FEED_HTTP_MAX_AGE секунд, личные — только браузеру с проверкой
+    при каждом запросе.
+    """
+    response['ETag'] = tag_etag
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.FEED_HTTP_MAX_AGE
+        )
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def cache_feed(*tag_templates, timeout=None):
+    """Кэширует GET-ответ страницы, помечая его тегами.
+
+    Шаблоны тегов заполняются именованными аргументами view и id
+    пользователя, например GROUP_TAG даёт 'group:<slug>'. Вместо шаблона
+    можно передать функцию (request, **kwargs), возвращающую тег. Запрос
+    с совпавшим If-None-Match получает 304. Ответы с CSRF-токеном
+    не кэшируются и не получают ETag, страницы с реплики хранятся
+    не дольше DATABASE_REPLICA_PIN_SECONDS.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            tags = _format_tags(request, tag_templates, kwargs)
+            tag_etag = quote_etag(etag(request, tags))
+            not_modified = get_conditional_response(request, etag=tag_etag)
+            if not_modified is not None:
+                request.page_cache = 'not-modified'
+                return _validated(request, not_modified, tag_etag)
+            key = 'page:' + tag_etag.strip('"')
+            cached = cache.get(key)
+            if cached is not None:
+                request.page_cache = 'hit'
+                content, content_type = cached
+                return _validated(
+                    request,
+                    HttpResponse(content, content_type=content_type),
+                    tag_etag,
+                )
+            request.page_cache = 'miss'
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not request.META.get('CSRF_COOKIE_USED')
+            ):
+                page_timeout = timeout or settings.FEED_CACHE_TIMEOUT
+                if routers.replica() is not None:
+                    page_timeout = settings.DATABASE_REPLICA_PIN_SECONDS
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    page_timeout,
+                )
+                _validated(request, response, tag_etag)
+            return response
+        return wrapper
+    return decorator
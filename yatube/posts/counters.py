@@ -0,0 +1,136 @@
+"""Денормализованные счётчики постов, комментариев и подписок."""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import AUTHOR_TAG, GROUP_TAG, POST_TAG, bump
+from .models import ArchivedPost, AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+RECONCILE_BATCH_SIZE = 500
+
+
+def count_subquery(model, field, outer='pk'):
+    """Подзапрос COUNT(*) строк model, ссылающихся на внешнюю строку."""
+    rows = model.objects.filter(**{field: OuterRef(outer)}).order_by()
+    return Coalesce(
+        Subquery(
+            rows.values(field).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def _add(queryset, **deltas):
+    return queryset.update(**{
+        name: Greatest(F(name) + delta, 0)
+        for name, delta in deltas.items()
+    })
+
+
+def author_expected():
+    return {
+        'posts_count': (
+            count_subquery(Post, 'author', 'user_id')
+            + count_subquery(ArchivedPost, 'author', 'user_id')
+        ),
+        'followers_count': count_subquery(Follow, 'author', 'user_id'),
+        'following_count': count_subquery(Follow, 'user', 'user_id'),
+    }
+
+
+def recount_author(user_id):
+    """Считает счётчики пользователя заново и возвращает их строку.
+
+    Строка перечитывается из базы, в которую записана, а не с реплики.
+    """
+    stats, _ = AuthorStats.objects.get_or_create(user_id=user_id)
+    AuthorStats.objects.filter(user_id=user_id).update(**author_expected())
+    stats.refresh_from_db(using=stats._state.db)
+    return stats
+
+
+def update_author(user_id, **deltas):
+    if not _add(AuthorStats.objects.filter(user_id=user_id), **deltas):
+        recount_author(user_id)
+
+
+def update_group(group_id, delta):
+    if group_id is not None:
+        _add(Group.objects.filter(pk=group_id), posts_count=delta)
+
+
+def update_post(post_id, delta):
+    _add(Post.objects.filter(pk=post_id), comments_count=delta)
+
+
+def stats_for(user):
+    """Счётчики пользователя; при отсутствии строки она создаётся."""
+    try:
+        return AuthorStats.objects.get(user=user)
+    except AuthorStats.DoesNotExist:
+        return recount_author(user.pk)
+
+
+def _author_tags(pks):
+    return [
+        AUTHOR_TAG.format(username=username)
+        for username in User.objects.filter(pk__in=pks).values_list(
+            'username', flat=True
+        )
+    ]
+
+
+def _group_tags(pks):
+    return [
+        GROUP_TAG.format(slug=slug)
+        for slug in Group.objects.filter(pk__in=pks).values_list(
+            'slug', flat=True
+        )
+    ]
+
+
+def _post_tags(pks):
+    return [POST_TAG.format(post_id=pk) for pk in pks]
+
+
+def reconcile():
+    """Исправляет расхождения счётчиков, возвращает число исправлений.
+
+    Страницы с исправленными счётчиками инвалидируются по тегам.
+    """
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(user_id=pk)
+         for pk in User.objects.filter(stats__isnull=True).values_list(
+             'pk', flat=True)),
+        ignore_conflicts=True
+    )
+    targets = (
+        (AuthorStats.objects.all(), author_expected(), _author_tags),
+        (Group.objects.all(), {'posts_count': count_subquery(Post, 'group')},
+         _group_tags),
+        (Post.objects.all(), {
+            'comments_count': count_subquery(Comment, 'post')
+        }, _post_tags),
+    )
+    fixed = {}
+    for queryset, expected, tags in targets:
+        aliases = {f'expected_{name}': value
+                   for name, value in expected.items()}
+        drift = Q()
+        for name in expected:
+            drift |= ~Q(**{name: F(f'expected_{name}')})
+        stale = queryset.annotate(**aliases).filter(drift).values_list(
+            'pk', flat=True
+        )
+        stale = list(stale)
+        for start in range(0, len(stale), RECONCILE_BATCH_SIZE):
+            batch = stale[start:start + RECONCILE_BATCH_SIZE]
+            queryset.filter(pk__in=batch).update(**expected)
+            bump(*tags(batch))
+        fixed[queryset.model._meta.model_name] = len(stale)
+    return fixed
@@ -0,0 +1,165 @@
+"""Материализованная лента подписок (fan-out-on-write).
+
+Новый пост раскладывается в ленты подписчиков автора. Для авторов
+с числом подписчиков больше FEED_FANOUT_LIMIT раскладка не делается:
+их посты подмешиваются в ленту при чтении (fan-out-on-read).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+TIMELINE_ORDERING = ('-feed_date', '-feed_post')
+PROLIFIC_CACHE_KEY = 'feed:prolific_authors'
+PROLIFIC_CACHE_TIMEOUT = 60 * 5
+
+
+def prolific_authors():
+    """Множество id авторов, чьи посты читаются без раскладки."""
+    authors = cache.get(PROLIFIC_CACHE_KEY)
+    if authors is None:
+        authors = set(
+            AuthorStats.objects.filter(
+                followers_count__gt=settings.FEED_FANOUT_LIMIT
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(PROLIFIC_CACHE_KEY, authors, PROLIFIC_CACHE_TIMEOUT)
+    return authors
+
+
+def _entries(user_ids, posts):
+    return [
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.id,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for user_id in user_ids
+        for post in posts
+    ]
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if post.author_id in prolific_authors():
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        _entries(followers.iterator(), [post]),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def _latest_posts(author_id):
+    return Post.objects.filter(author_id=author_id).only(
+        'id', 'author_id', 'pub_date'
+    )[:settings.FEED_BACKFILL]
+
+
+def backfill(user_id, author_id):
+    """Заполняет ленту последними постами автора после подписки."""
+    if author_id in prolific_authors():
+        return
+    TimelineEntry.objects.bulk_create(
+        _entries([user_id], _latest_posts(author_id)),
+        batch_size=settings.FEED_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def drop(user_id, author_id):
+    """Убирает посты автора из ленты после отписки."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+REBUILD_SQL = """
+    INSERT INTO {timeline} (user_id, post_id, author_id, pub_date)
+    SELECT follows.user_id, ranked.id, ranked.author_id, ranked.pub_date
+    FROM (SELECT DISTINCT user_id, author_id FROM {follow} {where})
+        AS follows
+    INNER JOIN (
+        SELECT id, author_id, pub_date,
+               ROW_NUMBER() OVER (
+                   PARTITION BY author_id ORDER BY pub_date DESC, id DESC
+               ) AS position
+        FROM {post}
+        WHERE author_id IN (SELECT author_id FROM {follow} {where})
+    ) AS ranked ON ranked.author_id = follows.author_id
+    LEFT OUTER JOIN {stats} AS stats ON stats.user_id = follows.author_id
+    WHERE ranked.position <= %s
+        AND COALESCE(stats.followers_count, 0) <= %s
+"""
+
+
+def rebuild(user_id=None):
+    """Пересобирает ленту пользователя или, без user_id, все ленты.
+
+    Выполняется одним INSERT ... SELECT: для каждой подписки берутся
+    последние FEED_BACKFILL постов автора, кроме авторов, читаемых
+    при выводе ленты.
+    """
+    entries = TimelineEntry.objects.all()
+    params = [settings.FEED_BACKFILL, settings.FEED_FANOUT_LIMIT]
+    where = ''
+    if user_id is not None:
+        entries = entries.filter(user_id=user_id)
+        where = 'WHERE user_id = %s'
+        params[:0] = [user_id, user_id]
+    sql = REBUILD_SQL.format(
+        timeline=TimelineEntry._meta.db_table,
+        follow=Follow._meta.db_table,
+        post=Post._meta.db_table,
+        stats=AuthorStats._meta.db_table,
+        where=where,
+    )
+    with transaction.atomic():
+        entries.delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+
+def _prolific_follows(user):
+    return list(Follow.objects.filter(
+        user=user,
+        author_id__in=prolific_authors()
+    ).values_list('author_id', flat=True))
+
+
+def timeline(user, prolific=None):
+    """Посты ленты подписок, отсортированные по TIMELINE_ORDERING.
+
+    Ключ сортировки — дата и пост из записи ленты, поэтому без авторов,
+    читаемых при выводе, посты выбираются в порядке индекса
+    (user, pub_date) без сортировки.
+    """
+    if prolific is None:
+        prolific = _prolific_follows(user)
+    if not prolific:
+        return Post.objects.filter(timeline__user=user).annotate(
+            feed_date=F('timeline__pub_date'),
+            feed_post=F('timeline__post'),
+        ).order_by(*TIMELINE_ORDERING)
+    return Post.objects.filter(
+        Q(id__in=TimelineEntry.objects.filter(user=user).values('post'))
+        | Q(author_id__in=prolific)
+    ).annotate(
+        feed_date=F('pub_date'), feed_post=F('id')
+    ).order_by(*TIMELINE_ORDERING)
+
+
+def count(user):
+    """Число постов ленты.
+
+    Без авторов, читаемых при выводе, считаются только записи ленты
+    по индексу, без соединения с постами.
+    """
+    prolific = _prolific_follows(user)
+    if not prolific:
+        return TimelineEntry.objects.filter(user=user).count()
+    return timeline(user, prolific).count()
@@ -1,18 +1,39 @@
 from django import forms
 
+from core.uploads import strip_metadata
+
 from .models import Comment, Post
 
 
+class UploadImageField(forms.ImageField):
+    """ImageField, показывающий ошибку потоковой проверки загрузки."""
+
+    def to_python(self, data):
+        error = getattr(data, 'upload_error', None)
+        if error is not None:
+            raise forms.ValidationError(error, code='rejected')
+        return super().to_python(data)
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
+        field_classes = {
+            'image': UploadImageField,
+        }
         labels = {
             'text': 'Текст',
             'group': 'Группа',
             'image': 'Изображение',
         }
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if getattr(image, 'image', None) is None:
+            return image
+        return strip_metadata(image)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
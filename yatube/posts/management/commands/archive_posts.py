@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import archive
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архивные таблицы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POST_ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше стольких дней.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=archive.ARCHIVE_BATCH_SIZE,
+        )
+
+    def handle(self, *args, days, batch_size, **options):
+        before = timezone.now() - timedelta(days=days)
+        total = archive.archive(before, batch_size=batch_size)
+        self.stdout.write(f'Перенесено в архив постов: {total}.')
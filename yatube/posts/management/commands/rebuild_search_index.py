@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.cache import INDEX_TAG, bump
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс постов.'
+
+    def handle(self, *args, **options):
+        total = search.rebuild()
+        bump(INDEX_TAG)
+        self.stdout.write(f'Проиндексировано постов: {total}.')
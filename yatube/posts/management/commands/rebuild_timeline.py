@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import feed
+from posts.cache import FOLLOWING_TAG, INDEX_TAG, bump
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает материализованные ленты подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            dest='username',
+            help='Пересобрать ленту только этого пользователя.',
+        )
+
+    def handle(self, *args, username=None, **options):
+        if username is None:
+            feed.rebuild()
+            bump(INDEX_TAG)
+            self.stdout.write('Пересобраны все ленты.')
+            return
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            raise CommandError(f'Пользователь {username} не найден.')
+        feed.rebuild(user.id)
+        bump(FOLLOWING_TAG.format(user_id=user.id))
+        self.stdout.write(f'Пересобрана лента {username}.')
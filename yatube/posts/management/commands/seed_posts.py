@@ -0,0 +1,249 @@
+import io
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+from multiprocessing import Pool
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from faker import Faker
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+TEXTS_PER_CHUNK = 200
+
+_worker = {}
+
+
+def _init_worker(user_count, group_count, alpha, seed):
+    _worker['weights'] = list(accumulate(
+        1 / (rank ** alpha) for rank in range(1, user_count + 1)
+    ))
+    _worker['users'] = range(user_count)
+    _worker['groups'] = group_count
+    _worker['seed'] = seed
+
+
+def _texts(chunk, max_chars):
+    fake = Faker('ru_RU')
+    fake.seed_instance(_worker['seed'] * 7919 + chunk)
+    return [
+        fake.text(max_nb_chars=max_chars)
+        for _ in range(min(TEXTS_PER_CHUNK, max_chars))
+    ]
+
+
+def _popular(rng, k=1):
+    return rng.choices(_worker['users'], cum_weights=_worker['weights'], k=k)
+
+
+def generate_posts(task):
+    """Строки постов: (автор, группа, текст, возраст в секундах)."""
+    chunk, count, max_age = task
+    rng = random.Random(_worker['seed'] * 1000003 + chunk)
+    texts = _texts(chunk, 400)
+    groups = _worker['groups']
+    return [
+        (
+            _popular(rng)[0],
+            rng.randrange(groups) if groups and rng.random() < 0.6 else None,
+            rng.choice(texts),
+            rng.randrange(max_age),
+        )
+        for _ in range(count)
+    ]
+
+
+def generate_comments(task):
+    """Строки комментариев: (доля позиции поста, автор, текст)."""
+    chunk, count, _ = task
+    rng = random.Random(_worker['seed'] * 1000033 + chunk)
+    texts = _texts(chunk, 200)
+    users = len(_worker['users'])
+    return [
+        (rng.random(), rng.randrange(users), rng.choice(texts))
+        for _ in range(count)
+    ]
+
+
+def generate_follows(task):
+    """Пары подписок (подписчик, автор) по степенному закону."""
+    chunk, users, average = task
+    rng = random.Random(_worker['seed'] * 1000037 + chunk)
+    total = len(_worker['users'])
+    pairs = set()
+    for user in users:
+        count = min(int(rng.paretovariate(1.5) * average / 3), total - 1)
+        for author in _popular(rng, count):
+            if author != user:
+                pairs.add((user, author))
+    return list(pairs)
+
+
+@contextmanager
+def explicit_pub_date():
+    """Позволяет задать pub_date вместо auto_now_add."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу пользователями, группами, постами, '
+        'комментариями и подписками через bulk_create.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.2,
+            help='Показатель степенного закона популярности авторов.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Глубина дат публикации в днях.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов генерации, по умолчанию все ядра.',
+        )
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def insert(self, label, model, batches):
+        """Вставляет объекты из итератора пачек, печатая прогресс."""
+        started = time.monotonic()
+        done = 0
+        for batch in batches:
+            model.objects.bulk_create(batch)
+            done += len(batch)
+            rate = done / (time.monotonic() - started)
+            self.stdout.write(f'{label}: {done} ({rate:.0f}/s)', ending='\r')
+        self.stdout.write('')
+
+    def chunks(self, total):
+        """Номер пачки, начало и размер для total строк."""
+        for chunk, start in enumerate(range(0, total, self.batch_size)):
+            yield chunk, start, min(self.batch_size, total - start)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        prefix = f"{options['prefix']}{options['seed']}_"
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {prefix} уже есть, '
+                f'задайте другой --seed или --prefix.'
+            )
+        users, groups = options['users'], options['groups']
+        if users < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+
+        self.insert('users', User, (
+            [
+                User(username=f'{prefix}{index}', password='!')
+                for index in range(start, start + count)
+            ]
+            for _, start, count in self.chunks(users)
+        ))
+        user_ids = list(User.objects.filter(
+            username__startswith=prefix
+        ).order_by('id').values_list('id', flat=True))
+
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        Group.objects.bulk_create(
+            Group(
+                title=fake.sentence(nb_words=3)[:200],
+                slug=f'{prefix}{index}'.replace('_', '-'),
+                description=fake.paragraph(),
+            )
+            for index in range(groups)
+        )
+        group_ids = list(Group.objects.filter(
+            slug__startswith=prefix.replace('_', '-')
+        ).order_by('id').values_list('id', flat=True))
+
+        connections.close_all()
+        now = timezone.now()
+        last_post = Post.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        with Pool(
+            options['workers'],
+            initializer=_init_worker,
+            initargs=(users, groups, options['alpha'], options['seed']),
+        ) as pool:
+            max_age = options['days'] * 24 * 60 * 60
+            with explicit_pub_date():
+                self.insert('posts', Post, (
+                    [
+                        Post(
+                            author_id=user_ids[author],
+                            group_id=(
+                                None if group is None else group_ids[group]
+                            ),
+                            text=text,
+                            pub_date=now - timedelta(seconds=age),
+                        )
+                        for author, group, text, age in rows
+                    ]
+                    for rows in pool.imap(generate_posts, (
+                        (chunk, count, max_age)
+                        for chunk, _, count in self.chunks(options['posts'])
+                    ))
+                ))
+            post_ids = list(Post.objects.filter(
+                id__gt=last_post
+            ).order_by('id').values_list('id', flat=True))
+
+            if post_ids:
+                self.insert('comments', Comment, (
+                    [
+                        Comment(
+                            post_id=post_ids[int(position * len(post_ids))],
+                            author_id=user_ids[author],
+                            text=text,
+                        )
+                        for position, author, text in rows
+                    ]
+                    for rows in pool.imap(generate_comments, (
+                        (chunk, count, None)
+                        for chunk, _, count in self.chunks(options['comments'])
+                    ))
+                ))
+
+            self.insert('follows', Follow, (
+                [
+                    Follow(user_id=user_ids[user], author_id=user_ids[author])
+                    for user, author in pairs
+                ]
+                for pairs in pool.imap(generate_follows, (
+                    (chunk, range(start, start + count), options['follows'])
+                    for chunk, start, count in self.chunks(users)
+                ))
+            ))
+
+        self.stdout.write('Пересчёт счётчиков, лент и поиска...')
+        call_command('recount_counters', stdout=io.StringIO())
+        call_command('rebuild_timeline', stdout=io.StringIO())
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.stdout.write(self.style.SUCCESS('Готово.'))
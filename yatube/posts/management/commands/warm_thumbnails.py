@@ -0,0 +1,60 @@
+from multiprocessing import Pool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def _render(task):
+    post_id, image = task
+    try:
+        return post_id, image, thumbnails.render(image), None
+    except Exception as error:
+        return post_id, image, None, error
+
+
+class Command(BaseCommand):
+    help = 'Строит недостающие миниатюры картинок постов на всех ядрах.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перестроить и уже готовые миниатюры.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов, по умолчанию все ядра.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').order_by()
+        if not options['all']:
+            posts = posts.filter(thumbnail='')
+        tasks = list(posts.values_list('id', 'image'))
+        connections.close_all()
+        done = failed = 0
+        results = {}
+        with Pool(options['workers']) as pool:
+            for post_id, image, name, error in pool.imap_unordered(
+                _render, tasks, chunksize=16
+            ):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'Пост {post_id}: {error}')
+                    continue
+                results[post_id] = (image, name)
+                if len(results) >= options['batch_size']:
+                    thumbnails.store(results)
+                    done += len(results)
+                    results = {}
+                    self.stdout.write(
+                        f'{done}/{len(tasks)}', ending='\r'
+                    )
+        thumbnails.store(results)
+        done += len(results)
+        self.stdout.write(
+            f'Готово миниатюр: {done}, с ошибками: {failed}.'
+        )
@@ -0,0 +1,86 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.feed import REBUILD_SQL
+
+
+def count_subquery(model, field, outer='pk'):
+    rows = model.objects.filter(**{field: OuterRef(outer)}).order_by()
+    return Coalesce(
+        Subquery(
+            rows.values(field).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    AuthorStats.objects.bulk_create(
+        AuthorStats(user_id=pk)
+        for pk in User.objects.values_list('pk', flat=True)
+    )
+    AuthorStats.objects.update(
+        posts_count=count_subquery(Post, 'author', 'user_id'),
+        followers_count=count_subquery(Follow, 'author', 'user_id'),
+        following_count=count_subquery(Follow, 'user', 'user_id'),
+    )
+    Group.objects.update(posts_count=count_subquery(Post, 'group'))
+    Post.objects.update(comments_count=count_subquery(Comment, 'post'))
+
+
+def fill_timeline(apps, schema_editor):
+    sql = REBUILD_SQL.format(
+        timeline=apps.get_model('posts', 'TimelineEntry')._meta.db_table,
+        follow=apps.get_model('posts', 'Follow')._meta.db_table,
+        post=apps.get_model('posts', 'Post')._meta.db_table,
+        stats=apps.get_model('posts', 'AuthorStats')._meta.db_table,
+        where='',
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            sql, [settings.FEED_BACKFILL, settings.FEED_FANOUT_LIMIT]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('followers_count', models.PositiveIntegerField(default=0)),
+                ('following_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+        migrations.RunPython(fill_timeline, migrations.RunPython.noop),
+    ]
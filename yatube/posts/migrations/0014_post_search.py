@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:52
+
+from django.db import migrations
+
+from posts.stemmer import terms
+
+
+def fill_search(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    rows = (
+        (post.pk, ' '.join(terms(post.text)))
+        for post in Post.objects.order_by().only('id', 'text').iterator()
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO posts_search (rowid, terms) VALUES (%s, %s)', rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE VIRTUAL TABLE posts_search USING fts5("
+            "terms, tokenize = 'unicode61 remove_diacritics 0')",
+            'DROP TABLE posts_search',
+        ),
+        migrations.RunPython(fill_search, migrations.RunPython.noop),
+    ]
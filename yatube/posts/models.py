@@ -1,5 +1,9 @@
+import json
+
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.db import models
+from django.utils.functional import cached_property
 
 User = get_user_model()
 
@@ -8,12 +12,40 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.title
 
 
-class Post(models.Model):
+class PostImageMixin:
+    """Миниатюры картинки поста для шаблонов."""
+
+    @cached_property
+    def variants(self):
+        return json.loads(self.image_variants or '{}')
+
+    @property
+    def srcset(self):
+        """Значения srcset по форматам миниатюры."""
+        return {
+            key: ', '.join(
+                f'{default_storage.url(name)} {width}w'
+                for name, width, _ in items
+            )
+            for key, items in self.variants.items()
+        }
+
+    @property
+    def thumbnail_size(self):
+        """Ширина и высота основной миниатюры."""
+        for name, width, height in self.variants.get('jpeg', ()):
+            if name == self.thumbnail.name:
+                return width, height
+        return None
+
+
+class Post(PostImageMixin, models.Model):
     text = models.TextField(
         'Текст поста',
         help_text='Введите текст поста'
@@ -22,6 +54,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -39,9 +75,36 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        upload_to='thumbnails/',
+        blank=True,
+        editable=False
+    )
+    image_variants = models.TextField(
+        'Варианты миниатюры',
+        blank=True,
+        editable=False,
+        help_text='JSON: {формат: [[имя, ширина, высота], ...]}'
+    )
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date'
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -67,6 +130,14 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('post', 'created', 'id'),
+                name='comment_post_created'
+            ),
+        )
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -79,3 +150,131 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
         related_name='following'
     )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'
+            ),
+        )
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики пользователя."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date'
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='timeline_user_author'
+            ),
+        )
+
+
+class ArchivedPost(PostImageMixin, models.Model):
+    """Старый пост, перенесённый из posts_post командой archive_posts.
+
+    id совпадает с id исходного поста, поэтому ссылки продолжают
+    работать.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации')
+    updated = models.DateTimeField('Дата изменения')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts'
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    thumbnail = models.ImageField(
+        'Миниатюра',
+        upload_to='thumbnails/',
+        blank=True
+    )
+    image_variants = models.TextField('Варианты миниатюры', blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='archived_post_author_pub_date'
+            ),
+        )
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+    text = models.TextField('Текст комментария')
+    created = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('post', 'created', 'id'),
+                name='archived_comment_created'
+            ),
+        )
@@ -1,8 +1,143 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('created', 'id')
+
+
+class CursorPage(Sequence):
+    """Страница keyset-пагинации: только ссылки «вперёд» и «назад»."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return '<CursorPage of %s items>' % len(self)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class SeekPaginator:
+    """Пагинация по ключу сортировки без COUNT(*) и OFFSET.
+
+    ordering — два поля: поле сортировки и уникальный pk для
+    разрешения равенства, например ('-pub_date', '-id').
+    Курсор — непрозрачный токен с направлением и значениями ключа.
+    """
+
+    def __init__(self, object_list, per_page, ordering=POST_ORDERING):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = ordering[0].startswith('-')
+
+    def encode_cursor(self, direction, obj):
+        if isinstance(obj, dict):
+            value, pk = (obj[field] for field in self.fields)
+        else:
+            value, pk = (getattr(obj, field) for field in self.fields)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        raw = f'{direction}|{value}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """(направление, дата, pk) из курсора или None, если он битый."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            direction, value, pk = raw.split('|')
+            pk = int(pk)
+            value = parse_datetime(value)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if direction not in ('n', 'p') or value is None:
+            return None
+        if settings.USE_TZ and timezone.is_naive(value):
+            value = timezone.make_aware(value, timezone.utc)
+        return direction, value, pk
+
+    def _seek(self, queryset, value, pk, after):
+        field, pk_field = self.fields
+        lookup = 'lt' if after == self.descending else 'gt'
+        return queryset.filter(
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'{pk_field}__{lookup}': pk})
+        )
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу по курсору; битый курсор — первая страница."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        queryset = self.object_list
+        backwards = False
+        if decoded is not None:
+            direction, value, pk = decoded
+            backwards = direction == 'p'
+            queryset = self._seek(queryset, value, pk, after=not backwards)
+        if backwards:
+            reverse = [
+                name[1:] if name.startswith('-') else '-' + name
+                for name in self.ordering
+            ]
+            queryset = queryset.order_by(*reverse)
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+        if not items:
+            return CursorPage(items)
+        has_next = has_more if not backwards else True
+        has_previous = decoded is not None if not backwards else has_more
+        return CursorPage(
+            items,
+            next_cursor=(
+                self.encode_cursor('n', items[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor('p', items[0]) if has_previous else None
+            ),
+        )
+
 
+def paginator(request, post_list, ordering=POST_ORDERING, count=None):
+    """Страница по ?cursor= или по номеру ?page=.
 
-def paginator(request, post_list):
+    count — функция, считающая объекты дешевле, чем COUNT по post_list.
+    """
+    cursor = request.GET.get('cursor')
+    if cursor is not None:
+        return SeekPaginator(
+            post_list, settings.POSTS_LIMIT, ordering=ordering
+        ).get_page(cursor)
     paginator = Paginator(post_list, settings.POSTS_LIMIT)
+    if count is not None:
+        paginator.count = count()
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
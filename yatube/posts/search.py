@@ -0,0 +1,124 @@
+"""Полнотекстовый поиск постов.
+
+Индекс — таблица SQLite FTS5, в которой по rowid = id поста хранятся
+основы слов текста (см. stemmer). Индекс обновляется сигналами при
+сохранении и удалении поста, результаты ранжируются по BM25.
+"""
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .stemmer import terms
+
+TABLE = 'posts_search'
+REBUILD_BATCH_SIZE = 2000
+
+
+def _document(text):
+    return ' '.join(terms(text))
+
+
+def index_posts(posts):
+    """Добавляет или обновляет посты в индексе."""
+    rows = [(post.pk, _document(post.text)) for post in posts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {TABLE} (rowid, terms) VALUES (%s, %s)',
+            rows,
+        )
+
+
+def remove(*post_ids):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [(post_id,) for post_id in post_ids],
+        )
+
+
+def rebuild():
+    """Строит индекс заново по всем постам, возвращает их число."""
+    total = 0
+    batch = []
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        for post in Post.objects.order_by().only('id', 'text').iterator(
+            chunk_size=REBUILD_BATCH_SIZE
+        ):
+            batch.append(post)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                index_posts(batch)
+                total += len(batch)
+                batch = []
+        index_posts(batch)
+    return total + len(batch)
+
+
+def match_expression(query):
+    """Выражение MATCH: все основы слов запроса, либо None."""
+    stems = dict.fromkeys(terms(query))
+    if not stems:
+        return None
+    return ' '.join(f'"{stem}"' for stem in stems)
+
+
+def filter_posts(queryset, query):
+    """Посты queryset, содержащие все слова запроса, без ранжирования."""
+    expression = match_expression(query)
+    if expression is None:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s', [expression]
+    ))
+
+
+def ranked_ids(query, limit=None, offset=0):
+    """id найденных постов, самые релевантные первыми."""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s '
+            f'ORDER BY rank LIMIT %s OFFSET %s',
+            [expression, -1 if limit is None else limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class SearchResults:
+    """Ленивый список найденных постов для Paginator."""
+
+    def __init__(self, query, queryset=None):
+        self.query = query
+        self.queryset = (
+            Post.objects.all() if queryset is None else queryset
+        )
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            expression = match_expression(self.query)
+            if expression is None:
+                self._count = 0
+            else:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'SELECT COUNT(*) FROM {TABLE} '
+                        f'WHERE {TABLE} MATCH %s', [expression]
+                    )
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = None if index.stop is None else index.stop - start
+        ids = ranked_ids(self.query, limit, start)
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
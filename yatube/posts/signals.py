@@ -0,0 +1,140 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_save
+)
+from django.dispatch import receiver
+
+from . import counters, feed, search, thumbnails
+from .cache import (
+    AUTHOR_TAG, FOLLOWING_TAG, GROUP_TAG, INDEX_TAG, POST_AUTHOR_KEY, POST_TAG,
+    bump
+)
+from .models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def invalidate_post(post, *group_ids):
+    """Сбрасывает кэш страниц, на которых виден пост."""
+    usernames = list(User.objects.filter(pk=post.author_id).values_list(
+        'username', flat=True
+    ))
+    if usernames:
+        cache.set(
+            POST_AUTHOR_KEY.format(post_id=post.pk), usernames[0],
+            settings.FEED_CACHE_TIMEOUT,
+        )
+    slugs = Group.objects.filter(
+        pk__in=[pk for pk in group_ids if pk not in (None, DEFERRED)]
+    ).values_list('slug', flat=True)
+    bump(
+        INDEX_TAG,
+        POST_TAG.format(post_id=post.pk),
+        *(AUTHOR_TAG.format(username=name) for name in usernames),
+        *(GROUP_TAG.format(slug=slug) for slug in slugs),
+    )
+
+
+def invalidate_author(user_id):
+    bump(*(
+        AUTHOR_TAG.format(username=name)
+        for name in User.objects.filter(pk=user_id).values_list(
+            'username', flat=True
+        )
+    ))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_init, sender=Post)
+def post_remember_group(sender, instance, **kwargs):
+    instance._loaded_group_id = instance.__dict__.get('group_id', DEFERRED)
+    image = instance.__dict__.get('image', DEFERRED)
+    instance._loaded_image = getattr(image, 'name', image)
+
+
+@receiver(pre_save, sender=Post)
+def post_image_changed(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._image_changed = bool(instance.image)
+    else:
+        loaded = instance._loaded_image
+        instance._image_changed = (
+            loaded is not DEFERRED and (loaded or '') != instance.image.name
+        )
+    if instance._image_changed:
+        instance.thumbnail = ''
+        instance.image_variants = ''
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out(instance)
+        counters.update_author(instance.author_id, posts_count=1)
+        counters.update_group(instance.group_id, 1)
+    elif instance._loaded_group_id not in (DEFERRED, instance.group_id):
+        counters.update_group(instance._loaded_group_id, -1)
+        counters.update_group(instance.group_id, 1)
+    if 'text' in instance.__dict__:
+        search.index_posts([instance])
+    if instance._image_changed and instance.image:
+        transaction.on_commit(partial(thumbnails.schedule, instance.pk))
+    invalidate_post(instance, instance._loaded_group_id, instance.group_id)
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.update_author(instance.author_id, posts_count=-1)
+    counters.update_group(instance.group_id, -1)
+    search.remove(instance.pk)
+    invalidate_post(instance, instance.group_id)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    bump(GROUP_TAG.format(slug=instance.slug))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.update_post(instance.post_id, 1)
+    bump(POST_TAG.format(post_id=instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.update_post(instance.post_id, -1)
+    bump(POST_TAG.format(post_id=instance.post_id))
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.update_author(instance.author_id, followers_count=1)
+        counters.update_author(instance.user_id, following_count=1)
+        feed.backfill(instance.user_id, instance.author_id)
+        invalidate_author(instance.author_id)
+        bump(FOLLOWING_TAG.format(user_id=instance.user_id))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    feed.drop(instance.user_id, instance.author_id)
+    counters.update_author(instance.author_id, followers_count=-1)
+    counters.update_author(instance.user_id, following_count=-1)
+    invalidate_author(instance.author_id)
+    bump(FOLLOWING_TAG.format(user_id=instance.user_id))
@@ -0,0 +1,147 @@
+"""Стеммер Snowball для русского языка и разбиение текста на термы.
+
+Реализация алгоритма https://snowballstem.org/algorithms/russian/
+без внешних зависимостей. Слова на других языках только приводятся
+к нижнему регистру.
+"""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+REFLEXIVE = ('ся', 'сь')
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но',
+     'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+     'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует',
+     'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+)
+DERIVATIONAL = ('ост', 'ость')
+SUPERLATIVE = ('ейш', 'ейше')
+
+WORD_RE = re.compile(r'\w+')
+MAX_TERM_LENGTH = 64
+
+
+def _regions(word):
+    """Начала областей RV и R2 по правилам Snowball."""
+    rv = r1 = r2 = len(word)
+    for index, letter in enumerate(word):
+        if letter in VOWELS:
+            rv = index + 1
+            break
+    for index in range(1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r1 = index + 1
+            break
+    for index in range(r1 + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            r2 = index + 1
+            break
+    return rv, r2
+
+
+@lru_cache(maxsize=None)
+def _longest_first(endings):
+    return sorted(endings, key=len, reverse=True)
+
+
+def _ending(word, start, endings):
+    """Самое длинное окончание из endings, лежащее внутри word[start:]."""
+    for ending in _longest_first(endings):
+        if word.endswith(ending) and len(word) - len(ending) >= start:
+            return ending
+    return None
+
+
+def _strip(word, start, endings):
+    """Слово без окончания из endings или None."""
+    ending = _ending(word, start, endings)
+    return None if ending is None else word[:-len(ending)]
+
+
+def _strip_grouped(word, start, groups):
+    """Как _strip, но окончания первой группы идут после «а» или «я».
+
+    Выбирается самое длинное окончание из обеих групп; если это
+    окончание первой группы без «а»/«я» перед ним, отрезать нечего.
+    """
+    first, second = groups
+    ending = _ending(word, start, first + second)
+    if ending is None:
+        return None
+    stem = word[:-len(ending)]
+    if ending in second:
+        return stem
+    if len(stem) > start and stem[-1] in 'ая':
+        return stem
+    return None
+
+
+def _strip_adjectival(word, start):
+    stem = _strip(word, start, ADJECTIVE)
+    if stem is None:
+        return None
+    participle = _strip_grouped(stem, start, PARTICIPLE)
+    return stem if participle is None else participle
+
+
+@lru_cache(maxsize=100000)
+def stem(word):
+    """Основа русского слова."""
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = _regions(word)
+
+    stemmed = _strip_grouped(word, rv, PERFECTIVE_GERUND)
+    if stemmed is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        for strip in (
+            _strip_adjectival,
+            lambda word, start: _strip_grouped(word, start, VERB),
+            lambda word, start: _strip(word, start, NOUN),
+        ):
+            stemmed = strip(word, rv)
+            if stemmed is not None:
+                break
+    word = stemmed if stemmed is not None else word
+
+    word = _strip(word, rv, ('и',)) or word
+    word = _strip(word, r2, DERIVATIONAL) or word
+
+    if word.endswith('нн') and len(word) - 1 > rv:
+        return word[:-1]
+    superlative = _strip(word, rv, SUPERLATIVE)
+    if superlative is not None:
+        word = superlative
+        if word.endswith('нн') and len(word) - 1 > rv:
+            word = word[:-1]
+        return word
+    return _strip(word, rv, ('ь',)) or word
+
+
+def terms(text):
+    """Основы слов текста в порядке появления."""
+    return [
+        stem(word) for word in WORD_RE.findall(text.lower())
+        if len(word) <= MAX_TERM_LENGTH and word != '_'
+    ]
@@ -0,0 +1,43 @@
+"""Потоковая отдача длинных страниц.
+
+Шаблон рендерится сразу, но вместо длинного списка в нём стоит
+маркер: всё до маркера уходит клиенту первым блоком, затем
+блоки списка, читаемые из базы через iterator(), затем остаток
+страницы. Время до первого байта и память не растут с длиной списка.
+"""
+from uuid import uuid4
+
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
+
+
+def render_stream(request, template_name, context, chunks):
+    """StreamingHttpResponse страницы с чанками на месте stream_marker."""
+    marker = uuid4().hex
+    head, tail = render_to_string(
+        template_name, {**context, 'stream_marker': marker}, request
+    ).split(marker, 1)
+
+    def content():
+        yield head
+        yield from chunks
+        yield tail
+
+    return StreamingHttpResponse(content())
+
+
+def render_chunks(request, template_name, name, queryset, chunk_size):
+    """Рендерит шаблон для каждой пачки объектов queryset.
+
+    Строки читаются курсором через iterator(), в памяти одновременно
+    только одна пачка.
+    """
+    template = get_template(template_name)
+    batch = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        batch.append(obj)
+        if len(batch) == chunk_size:
+            yield template.render({name: batch}, request)
+            batch = []
+    if batch:
+        yield template.render({name: batch}, request)
@@ -1,11 +1,13 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
 from ..models import Post
 
@@ -94,3 +96,107 @@ class PostFormTests(TestCase):
             follow=True
         )
         self.assertEqual(comments_count + 1, self.post.comments.count())
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='test-post')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def image(self, size=(40, 20), image_format='JPEG', **options):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, image_format, **options)
+        return buffer.getvalue()
+
+    def edit(self, content, name='image.jpg'):
+        return self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={
+                'text': 'test-text',
+                'image': SimpleUploadedFile(name, content, 'image/jpeg'),
+            },
+        )
+
+    def test_upload_strips_exif(self):
+        exif = Image.Exif()
+        exif[0x010e] = 'secret'
+        self.edit(self.image(exif=exif.tobytes()))
+        post = Post.objects.get(pk=self.post.pk)
+        with Image.open(post.image.path) as saved:
+            self.assertEqual(saved.size, (40, 20))
+            self.assertNotIn(0x010e, saved.getexif())
+
+    @override_settings(IMAGE_DECODE_MAX_PIXELS=4000 * 3000)
+    def test_large_jpeg_is_not_pixel_capped(self):
+        self.edit(self.image((4000, 3001)))
+        post = Post.objects.get(pk=self.post.pk)
+        with Image.open(post.image.path) as saved:
+            self.assertEqual(saved.size[0], settings.IMAGE_STORED_MAX_SIDE)
+
+    @override_settings(IMAGE_STORED_MAX_SIDE=20)
+    def test_upload_is_downscaled(self):
+        self.edit(self.image())
+        post = Post.objects.get(pk=self.post.pk)
+        with Image.open(post.image.path) as saved:
+            self.assertEqual(saved.size, (20, 10))
+
+    def test_upload_rejected_early(self):
+        cases = {
+            'size': (
+                {'IMAGE_UPLOAD_MAX_SIZE': 100}, self.image(), 'Файл больше'
+            ),
+            'side': (
+                {'IMAGE_UPLOAD_MAX_SIDE': 30}, self.image(), 'пикселей'
+            ),
+            'format': ({}, b'not an image at all', 'JPEG, PNG, GIF'),
+            'png_pixels': (
+                {'IMAGE_DECODE_MAX_PIXELS': 4000 * 3000},
+                self.image((4000, 3001), 'PNG'),
+                'млн пикселей',
+            ),
+            'gif_pixels': (
+                {'IMAGE_DECODE_MAX_PIXELS': 4000 * 3000},
+                self.image((4000, 3001), 'GIF'),
+                'млн пикселей',
+            ),
+        }
+        for case, (options, content, error) in cases.items():
+            with self.subTest(case=case), self.settings(**options):
+                response = self.edit(content)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(
+                    error, response.context['form'].errors['image'][0]
+                )
+                self.assertFalse(Post.objects.get(pk=self.post.pk).image)
+
+    @override_settings(
+        IMAGE_UPLOAD_MAX_SIZE=100, DATA_UPLOAD_MAX_MEMORY_SIZE=100
+    )
+    def test_oversized_request_is_not_parsed(self):
+        response = self.edit(self.image())
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(Post.objects.get(pk=self.post.pk).image)
+
+    def test_upload_still_checks_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'test-text'},
+        )
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+        self.assertNotEqual(
+            Post.objects.get(pk=self.post.pk).text, 'test-text'
+        )
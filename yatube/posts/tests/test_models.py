@@ -1,7 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-from ..models import Group, Post
+from .. import counters
+from ..models import AuthorStats, Comment, Follow, Group, Post
+from ..paginator import COMMENT_ORDERING
 
 User = get_user_model()
 
@@ -33,3 +39,107 @@ class PostModelTest(TestCase):
         for field, str_text in model_str.items():
             with self.subTest(field=field):
                 self.assertEqual(str(field), str_text)
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def test_counters_follow_changes(self):
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        Comment.objects.create(post=post, author=self.reader, text='текст')
+        Follow.objects.create(user=self.reader, author=self.user)
+        post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(counters.stats_for(self.user).posts_count, 1)
+        self.assertEqual(counters.stats_for(self.user).followers_count, 1)
+        self.assertEqual(counters.stats_for(self.reader).following_count, 1)
+        post.group = None
+        post.save()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        post.delete()
+        Follow.objects.all().delete()
+        self.assertEqual(counters.stats_for(self.user).posts_count, 0)
+        self.assertEqual(counters.stats_for(self.user).followers_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Тестовый пост', group=self.group)
+            for i in range(3)
+        )
+        fixed = counters.reconcile()
+        self.assertEqual(fixed['group'], 1)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 3)
+        self.assertEqual(counters.stats_for(self.user).posts_count, 3)
+        self.assertEqual(counters.reconcile()['group'], 0)
+
+    def test_reconcile_invalidates_pages(self):
+        cache.clear()
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group
+        )
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'auth'}),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=5)
+        AuthorStats.objects.filter(user=self.user).update(posts_count=5)
+        counters.reconcile()
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+
+class IndexesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент и комментариев идут по составным индексам."""
+        older = Q(pub_date__lt=self.post.pub_date) | Q(
+            pub_date=self.post.pub_date, id__lt=self.post.id
+        )
+        queries = (
+            ('post_pub_date', Post.objects.all()),
+            ('post_author_pub_date', self.user.posts.all()),
+            ('post_author_pub_date', self.user.posts.filter(older)),
+            ('post_group_pub_date', self.group.posts.all()),
+            ('comment_post_created',
+             self.post.comments.order_by(*COMMENT_ORDERING)),
+        )
+        for index, queryset in queries:
+            with self.subTest(index=index, query=str(queryset.query)):
+                self.assertIn(index, queryset[:10].explain())
+
+    def test_follow_is_unique(self):
+        Follow.objects.create(user=self.reader, author=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.user)
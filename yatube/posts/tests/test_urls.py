@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 
 from ..models import Group, Post
@@ -30,6 +31,7 @@ class StaticURLTests(TestCase):
         self.authorized_client.force_login(self.auth)
         self.authorized_no_auth = Client()
         self.authorized_no_auth.force_login(self.user)
+        cache.clear()
 
     def test_pages(self):
         url_names = (
@@ -72,6 +74,7 @@ class StaticURLTests(TestCase):
             f'/posts/{self.post.pk}/': 'posts/post_detail.html',
             f'/posts/{self.post.pk}/edit/': 'posts/create_post.html',
             '/create/': 'posts/create_post.html',
+            '/search/?q=test': 'posts/search.html',
 
         }
         for address, template in templates_url_names.items():
@@ -1,18 +1,41 @@
+import base64
 import shutil
 import tempfile
+import warnings
+from datetime import timedelta
+from io import StringIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from .. import counters, feed, thumbnails
+from ..archive import PostChain
+from ..cache import POST_AUTHOR_KEY
 from ..forms import PostForm
-from ..models import Follow, Group, Post
+from ..models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Group, Post,
+    TimelineEntry
+)
+from ..paginator import SeekPaginator
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 User = get_user_model()
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
 
 
 class TaskPagesTests(TestCase):
@@ -95,6 +118,7 @@ class TaskPagesTests(TestCase):
                 'posts/create_post.html',
             reverse('posts:post_create'): 'posts/create_post.html',
             reverse('posts:follow_index'): 'posts/follow.html',
+            reverse('posts:post_search'): 'posts/search.html',
         }
         for reverse_name, template in templates_pages_names.items():
             with self.subTest(reverse_name=reverse_name):
@@ -145,18 +169,98 @@ class TaskPagesTests(TestCase):
     def test_index_cash(self):
         response = self.authorized_client.get(reverse('posts:index'))
         posts = response.content
+        Post.objects.filter(pk=self.post.pk).update(text='test-post-update')
+        response_old = self.authorized_client.get(reverse('posts:index'))
+        posts_old = response_old.content
+        self.assertEqual(posts, posts_old)
         Post.objects.create(
             author=self.user,
             text='test-post',
         )
-        response_old = self.authorized_client.get(reverse('posts:index'))
-        posts_old = response_old.content
-        self.assertEqual(posts, posts_old)
-        cache.clear()
         response_new = self.authorized_client.get(reverse('posts:index'))
         posts_new = response_new.content
         self.assertNotEqual(posts_new, posts_old)
 
+    def test_post_card_cache(self):
+        self.authorized_client.get(reverse('posts:index'))
+        Post.objects.filter(pk=self.post.pk).update(text='test-post-stale')
+        Post.objects.create(author=self.user, text='test-post-new')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'test-post-stale')
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'test-post-edited', 'group': self.group.id},
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'test-post-edited')
+
+    def test_post_detail_comments_queries(self):
+        post = Post.objects.create(author=self.user, text='test-post')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.follow, text='comment')
+            for i in range(settings.COMMENTS_LIMIT + 5)
+        )
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+        with self.assertNumQueries(3):
+            response = self.unauthorized_client.get(url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_LIMIT)
+        response = self.unauthorized_client.get(
+            url + f'?cursor={comments.next_cursor}'
+        )
+        self.assertEqual(len(response.context['comments']), 5)
+
+    @override_settings(COMMENTS_STREAM_CHUNK=10)
+    def test_post_detail_streams_all_comments(self):
+        post = Post.objects.create(author=self.user, text='test-post')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=self.follow, text=f'comment-{i:03}')
+            for i in range(settings.COMMENTS_LIMIT + 5)
+        )
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+        response = self.unauthorized_client.get(url)
+        self.assertContains(response, '?comments=all')
+        response = self.unauthorized_client.get(url + '?comments=all')
+        self.assertTrue(response.streaming)
+        chunks = [
+            chunk.decode() for chunk in response.streaming_content
+        ]
+        self.assertIn('test-post', chunks[0])
+        self.assertNotIn('comment-', chunks[0])
+        self.assertEqual(len(chunks), 5)
+        content = ''.join(chunks)
+        positions = [
+            content.index(f'comment-{i:03}')
+            for i in range(settings.COMMENTS_LIMIT + 5)
+        ]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIn('</footer>', chunks[-1])
+
+    def test_post_detail_author_count_invalidated(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        cache.delete(POST_AUTHOR_KEY.format(post_id=self.post.id))
+        response = self.unauthorized_client.get(url)
+        count = response.context['author_stats'].posts_count
+        self.unauthorized_client.get(url)
+        self.assertEqual(
+            self.unauthorized_client.get(url).wsgi_request.page_cache, 'hit'
+        )
+        Post.objects.create(author=self.user, text='test-post-other')
+        response = self.unauthorized_client.get(url)
+        self.assertEqual(
+            response.context['author_stats'].posts_count, count + 1
+        )
+
+    def test_comment_invalidates_post_detail(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        self.unauthorized_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            data={'text': 'test-comment'},
+        )
+        response = self.unauthorized_client.get(url)
+        self.assertContains(response, 'test-comment')
+
     def test_follow_index(self):
         Follow.objects.create(user=self.user, author=self.follow)
         response = self.authorized_client.get(reverse('posts:follow_index'))
@@ -190,6 +294,183 @@ class TaskPagesTests(TestCase):
         ).count()
         self.assertEqual(follow, 0)
 
+    def test_follow_index_fan_out(self):
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.follow})
+        )
+        post = Post.objects.create(author=self.follow, text='fan-out')
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'])
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.follow})
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+
+    def test_timeline_reads_entry_index(self):
+        Follow.objects.create(user=self.user, author=self.follow)
+        Post.objects.bulk_create(
+            Post(author=self.follow, text='test-post') for i in range(3)
+        )
+        call_command('rebuild_timeline', username=self.user.username,
+                     stdout=StringIO())
+        posts = feed.timeline(self.user).select_related('author', 'group')
+        plan = posts.explain()
+        self.assertIn('timeline_user_pub_date', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(feed.count(self.user), 3)
+        self.assertNotIn('posts_post', queries[-1]['sql'])
+        self.assertEqual(
+            [post.id for post in posts],
+            list(Post.objects.filter(author=self.follow).values_list(
+                'id', flat=True
+            )),
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_follow_index_prolific_author(self):
+        self.addCleanup(cache.clear)
+        Follow.objects.create(user=self.user, author=self.follow)
+        post = Post.objects.create(author=self.follow, text='fan-out-on-read')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertIn(post, response.context['page_obj'])
+
+    def test_rebuild_timeline(self):
+        Follow.objects.create(user=self.user, author=self.follow)
+        Post.objects.bulk_create(
+            Post(author=self.follow, text='test-post') for i in range(3)
+        )
+        call_command('rebuild_timeline', username=self.user.username,
+                     stdout=StringIO())
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 3
+        )
+
+    def test_seed_posts(self):
+        call_command('seed_posts', users=30, groups=2, posts=200,
+                     comments=100, follows=5, batch_size=64, workers=1,
+                     stdout=StringIO())
+        seeded = Post.objects.filter(author__username__startswith='seed0_')
+        self.assertEqual(seeded.count(), 200)
+        self.assertEqual(
+            Comment.objects.filter(post__in=seeded).count(), 100
+        )
+        author = seeded.first().author
+        self.assertEqual(
+            author.stats.posts_count, author.posts.count()
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='test-post',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_generated_thumbnail_is_shown(self):
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+        thumbnails.generate(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.thumbnail.name, 'thumbnails/small_960x339.jpg'
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.thumbnail.url)
+        self.assertNotContains(response, self.post.image.url)
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_thumbnail_variants(self):
+        thumbnails.generate(self.post.pk)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(
+            [width for _, width, _ in post.variants['webp']],
+            list(thumbnails.WIDTHS)
+        )
+        self.assertEqual(post.thumbnail_size, thumbnails.SIZE)
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'type="image/webp"')
+        for name, width, _ in post.variants['webp']:
+            self.assertContains(
+                response, f'{settings.MEDIA_URL}{name} {width}w'
+            )
+
+    def test_new_image_resets_thumbnail(self):
+        thumbnails.generate(self.post.pk)
+        self.post.refresh_from_db()
+        self.post.image = SimpleUploadedFile(
+            name='other.gif', content=SMALL_GIF, content_type='image/gif'
+        )
+        self.post.save()
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.thumbnail)
+
+    def test_warm_thumbnails(self):
+        call_command('warm_thumbnails', workers=1, stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnail)
+
+
+class SearchViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.relevant = Post.objects.create(
+            author=cls.user, text='Красивые книги о книгах и книжках'
+        )
+        cls.other = Post.objects.create(
+            author=cls.user, text='Прочитал одну книгу про котов'
+        )
+        Post.objects.create(author=cls.user, text='Совсем другой текст')
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query):
+        response = self.client.get(reverse('posts:post_search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_finds_word_forms_by_rank(self):
+        self.assertEqual(self.search('книга'), [self.relevant, self.other])
+        self.assertEqual(self.search('котами книгой'), [self.other])
+        self.assertEqual(self.search(''), [])
+
+    def test_search_index_follows_edits(self):
+        self.other.text = 'Прочитал одну статью про котов'
+        self.other.save()
+        self.assertEqual(self.search('книги'), [self.relevant])
+        self.relevant.delete()
+        self.assertEqual(self.search('книги'), [])
+        self.assertEqual(self.search('статьи'), [self.other])
+
+    def test_rebuild_search_index(self):
+        Post.objects.bulk_create([Post(author=self.user, text='новые книги')])
+        self.assertEqual(len(self.search('новая')), 0)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('новая')), 1)
+
 
 class PaginatorViewsTest(TestCase):
     @classmethod
@@ -214,9 +495,11 @@ class PaginatorViewsTest(TestCase):
             )
             for i in range(13)
         ])
+        counters.recount_author(cls.author.pk)
         Follow.objects.create(user=cls.user_paginator, author=cls.author)
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.client.force_login(self.user_paginator)
 
@@ -235,3 +518,280 @@ class PaginatorViewsTest(TestCase):
                         reverse(page, kwargs=kwargs) + f'?page={num}'
                     )
                     self.assertEqual(len(response.context['page_obj']), posts)
+
+    def test_cursor_paginator(self):
+        url = reverse('posts:index')
+        first = self.client.get(url + '?cursor=').context['page_obj']
+        self.assertEqual(len(first), 10)
+        self.assertFalse(first.has_previous())
+        second = self.client.get(
+            url + f'?cursor={first.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(len(second), 3)
+        self.assertFalse(second.has_next())
+        back = self.client.get(
+            url + f'?cursor={second.previous_cursor}'
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
+        ids = [post.id for post in first] + [post.id for post in second]
+        self.assertEqual(
+            ids, list(Post.objects.values_list('id', flat=True))
+        )
+
+    def test_malformed_cursor(self):
+        post = Post.objects.first()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        )
+        cursors = ('n|abc|1', 'n|2020-13-45T00:00:00|1', 'x|y', '%%%')
+        for url in urls:
+            for raw in cursors:
+                cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+                with self.subTest(url=url, raw=raw):
+                    response = self.client.get(url, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+
+    def test_naive_cursor(self):
+        url = reverse('posts:index')
+        first = self.client.get(url + '?cursor=').context['page_obj']
+        last = first[-1]
+        raw = f'n|{last.pub_date.replace(tzinfo=None).isoformat()}|{last.id}'
+        cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            second = self.client.get(url, {'cursor': cursor})
+        self.assertEqual(len(second.context['page_obj']), 3)
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='test-post',
+            group=cls.group,
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, text='test-post', group=cls.group)
+            for i in range(15)
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text='comment')
+            for i in range(30)
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        cache.clear()
+
+    def test_views_within_query_budget(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='test-post', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified(self):
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        response = self.client.get(url)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_with_post(self):
+        url = reverse('posts:index')
+        old_etag = self.client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='new-post')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=old_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], old_etag)
+
+    def test_authorized_pages_are_private(self):
+        urls = (reverse('posts:index'), reverse('posts:follow_index'))
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertNotEqual(
+                    response['ETag'], self.client.get(url).get('ETag')
+                )
+
+    def test_follow_invalidates_follow_index(self):
+        author = User.objects.create_user(username='author')
+        Post.objects.create(author=author, text='followed-post')
+        url = reverse('posts:follow_index')
+        old_etag = self.authorized_client.get(url)['ETag']
+        Follow.objects.create(user=self.user, author=author)
+        response = self.authorized_client.get(
+            url, HTTP_IF_NONE_MATCH=old_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 1)
+
+    def test_forms_are_not_cached(self):
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertFalse(response.has_header('ETag'))
+
+
+@override_settings(POSTS_LIMIT=3)
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='test-group',
+            slug='test-slug',
+            description='test-description',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, text=f'test-post-{i}', group=cls.group
+            )
+            for i in range(5)
+        ]
+        for age, post in zip((400, 300, 200, 1, 0), cls.posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=age)
+            )
+        cls.old = cls.posts[0]
+        Comment.objects.create(post=cls.old, author=cls.user, text='old')
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=cls.user)
+        call_command('archive_posts', days=30, batch_size=2,
+                     stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_old_posts_moved(self):
+        self.assertEqual(
+            set(Post.objects.values_list('id', flat=True)),
+            {post.id for post in self.posts[3:]},
+        )
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        self.assertEqual(ArchivedComment.objects.get().post_id, self.old.id)
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(
+            TimelineEntry.objects.filter(post_id=self.old.id).exists()
+        )
+        self.assertEqual(Group.objects.get().posts_count, 2)
+        self.assertEqual(counters.stats_for(self.user).posts_count, 5)
+        self.assertEqual(counters.reconcile()['authorstats'], 0)
+
+    def test_archived_post_detail(self):
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old.id})
+        )
+        self.assertEqual(response.context['post'].text, self.old.text)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['old'],
+        )
+        self.assertNotContains(
+            response,
+            reverse('posts:add_comment', kwargs={'post_id': self.old.id}),
+        )
+
+    def test_profile_continues_into_archive(self):
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        expected = [post.id for post in reversed(self.posts)]
+        pages = [
+            [post.id for post in self.authorized_client.get(
+                url, {'page': page}
+            ).context['page_obj']]
+            for page in (1, 2)
+        ]
+        self.assertEqual(pages[0] + pages[1], expected)
+        first = self.authorized_client.get(
+            url, {'cursor': ''}
+        ).context['page_obj']
+        second = self.authorized_client.get(
+            url, {'cursor': first.next_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in first] + [post.id for post in second],
+            expected,
+        )
+        back = self.authorized_client.get(
+            url, {'cursor': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
+
+    def test_profile_page_uses_stats_count(self):
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 5)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries
+        ))
+
+    def test_chain_straddles_archive(self):
+        chain = PostChain(
+            self.user.posts.all(), self.user.archived_posts.all()
+        )
+        ids = [post.id for post in reversed(self.posts)]
+        self.assertEqual([post.id for post in chain[1:4]], ids[1:4])
+        self.assertEqual([post.id for post in chain[3:5]], ids[3:5])
+        ascending = chain.order_by('pub_date', 'id')
+        self.assertEqual(
+            [post.id for post in ascending[2:4]],
+            [self.posts[2].id, self.posts[3].id],
+        )
+        paginator = SeekPaginator(chain, 2)
+        after = paginator.encode_cursor('n', chain[0])
+        self.assertEqual(
+            [post.id for post in paginator.get_page(after)], ids[1:3]
+        )
+        before = paginator.encode_cursor('p', chain[3])
+        self.assertEqual(
+            [post.id for post in paginator.get_page(before)], ids[1:3]
+        )
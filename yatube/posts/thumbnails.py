@@ -0,0 +1,143 @@
+"""Фоновая подготовка миниатюр картинок постов.
+
+Миниатюры строятся функцией render без обращения к базе, поэтому её
+можно вызывать и в потоках веб-процесса, и в пуле процессов команды
+warm_thumbnails. Для каждой картинки готовится несколько ширин
+в JPEG и WebP: основная миниатюра сохраняется в Post.thumbnail,
+а все варианты с размерами — в Post.image_variants для srcset.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import AUTHOR_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, bump
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+SIZE = (960, 339)
+WIDTHS = (480, 960, 1440)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 85, 'optimize': True}),
+}
+STORE_BATCH_SIZE = 500
+
+_executor = None
+
+
+def variant_name(image_name, width, height, extension):
+    base = os.path.splitext(os.path.basename(image_name))[0]
+    return f'thumbnails/{base}_{width}x{height}.{extension}'
+
+
+def _save(name, image, image_format, options):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def render(image_name):
+    """Строит варианты миниатюры картинки из хранилища.
+
+    Картинка обрезается по центру до пропорций SIZE и масштабируется,
+    как {% thumbnail ... crop="center" upscale=True %} в sorl.
+    Возвращает {формат: [[имя, ширина, высота], ...]} по возрастанию
+    ширины.
+    """
+    with default_storage.open(image_name) as source:
+        original = Image.open(source)
+        original = original.convert('RGB')
+    variants = {key: [] for key in FORMATS}
+    for width in WIDTHS:
+        height = round(width * SIZE[1] / SIZE[0])
+        image = ImageOps.fit(original, (width, height), Image.LANCZOS)
+        for key, (image_format, extension, options) in FORMATS.items():
+            name = variant_name(image_name, width, height, extension)
+            variants[key].append([
+                _save(name, image, image_format, options), width, height
+            ])
+    return variants
+
+
+def main_thumbnail(variants):
+    """Имя JPEG-миниатюры размера SIZE среди вариантов."""
+    for name, width, height in variants['jpeg']:
+        if width == SIZE[0]:
+            return name
+
+
+def store(results):
+    """Записывает миниатюры {id поста: (картинка, варианты)}.
+
+    Пропускает посты, картинку которых успели сменить, и сбрасывает
+    кэш страниц с обновлёнными постами.
+    """
+    ids = list(results)
+    for start in range(0, len(ids), STORE_BATCH_SIZE):
+        posts = [
+            post for post in Post.objects.filter(
+                pk__in=ids[start:start + STORE_BATCH_SIZE]
+            ).select_related('author', 'group').only(
+                'id', 'image', 'author__username', 'group__slug'
+            )
+            if post.image.name == results[post.pk][0]
+        ]
+        now = timezone.now()
+        for post in posts:
+            variants = results[post.pk][1]
+            post.thumbnail = main_thumbnail(variants)
+            post.image_variants = json.dumps(variants)
+            post.updated = now
+        Post.objects.bulk_update(
+            posts, ('thumbnail', 'image_variants', 'updated')
+        )
+        tags = {INDEX_TAG}
+        for post in posts:
+            tags.add(POST_TAG.format(post_id=post.pk))
+            tags.add(AUTHOR_TAG.format(username=post.author.username))
+            if post.group is not None:
+                tags.add(GROUP_TAG.format(slug=post.group.slug))
+        bump(*tags)
+
+
+def generate(post_id):
+    """Строит и сохраняет миниатюру поста."""
+    image = Post.objects.filter(pk=post_id).values_list(
+        'image', flat=True
+    ).first()
+    if image:
+        store({post_id: (image, render(image))})
+
+
+def _generate_in_background(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Не удалось построить миниатюру поста %s', post_id)
+    finally:
+        connection.close()
+
+
+def schedule(post_id):
+    """Ставит построение миниатюры в очередь пула потоков."""
+    global _executor
+    if not settings.THUMBNAIL_WORKERS:
+        generate(post_id)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails'
+        )
+    _executor.submit(_generate_in_background, post_id)
@@ -1,16 +1,26 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
 
+from core.routers import read_from_replica
+from core.uploads import image_uploads
+
+from . import archive, counters, feed, search, streaming
+from .cache import (
+    AUTHOR_TAG, FOLLOWING_TAG, GROUP_TAG, INDEX_TAG, POST_TAG, cache_feed,
+    post_author_tag
+)
 from .forms import CommentForm, PostForm
-from .models import Comment, Follow, Group, Post
-from .paginator import paginator
+from .models import ArchivedPost, Follow, Group, Post
+from .paginator import COMMENT_ORDERING, SeekPaginator, paginator
 
 User = get_user_model()
 
 
-@cache_page(60 * 20)
+@read_from_replica
+@cache_feed(INDEX_TAG)
 def index(request):
     post_list = Post.objects.select_related('author', 'group')
     context = {
@@ -19,6 +29,8 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@read_from_replica
+@cache_feed(GROUP_TAG)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     post_list = group.posts.select_related('author')
@@ -29,14 +41,23 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@read_from_replica
+@cache_feed(AUTHOR_TAG)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_author = author.posts.select_related('group')
-    posts_count = post_author.count()
-    following = Follow.objects.filter(user=request.user, author=author)
+    post_author = archive.PostChain(
+        author.posts.select_related('group'),
+        author.archived_posts.select_related('group'),
+    )
+    posts_count = counters.stats_for(author).posts_count
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     context = {
         'author': author,
-        'page_obj': paginator(request, post_author),
+        'page_obj': paginator(
+            request, post_author, count=lambda: posts_count
+        ),
         'post_author': post_author,
         'posts_count': posts_count,
         'following': following,
@@ -44,20 +65,68 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+@cache_feed(INDEX_TAG)
+def post_search(request):
+    query = request.GET.get('q', '').strip()
+    results = search.SearchResults(
+        query, Post.objects.select_related('author', 'group')
+    )
+    context = {
+        'query': query,
+        'page_obj': Paginator(results, settings.POSTS_LIMIT).get_page(
+            request.GET.get('page')
+        ),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@read_from_replica
+@cache_feed(POST_TAG, post_author_tag)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = Post.objects.select_related('author', 'group').filter(
+        id=post_id
+    ).first()
+    if post is None:
+        post = get_object_or_404(
+            ArchivedPost.objects.select_related('author', 'group'),
+            id=post_id,
+        )
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.select_related('post').filter(post=post)
+    stream = request.GET.get('comments') == 'all'
+    if stream:
+        comments = post.comments.select_related('author').order_by(
+            *COMMENT_ORDERING
+        )
+        # База выбирается сейчас: генератор дочитывает комментарии уже
+        # после того, как read_from_replica вернёт чтение на primary.
+        comments = comments.using(comments.db)
+    else:
+        comments = SeekPaginator(
+            post.comments.select_related('author'),
+            settings.COMMENTS_LIMIT,
+            ordering=COMMENT_ORDERING,
+        ).get_page(request.GET.get('cursor'))
     context = {
         'post': post,
+        'author_stats': counters.stats_for(post.author),
         'title': post.text[:30],
+        'archived': isinstance(post, ArchivedPost),
         'form': form,
         'comments': comments,
     }
+    if stream:
+        return streaming.render_stream(
+            request, 'posts/post_detail.html', context,
+            streaming.render_chunks(
+                request, 'posts/includes/comments.html', 'comments',
+                comments, settings.COMMENTS_STREAM_CHUNK,
+            ),
+        )
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@image_uploads
 def post_create(request):
     form = PostForm(request.POST or None)
     if not form.is_valid():
@@ -73,6 +142,7 @@ def post_create(request):
 
 
 @login_required
+@image_uploads
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     if request.user != post.author:
@@ -102,15 +172,15 @@ def add_comment(request, post_id):
 
 
 @login_required
+@read_from_replica
+@cache_feed(INDEX_TAG, FOLLOWING_TAG)
 def follow_index(request):
-    followers = Follow.objects.select_related('user', 'author').filter(
-        user=request.user
-    )
-    post_list = Post.objects.select_related('author', 'group').filter(
-        author__in=followers.values('author')
-    )
+    post_list = feed.timeline(request.user).select_related('author', 'group')
     context = {
-        'page_obj': paginator(request, post_list),
+        'page_obj': paginator(
+            request, post_list, ordering=feed.TIMELINE_ORDERING,
+            count=lambda: feed.count(request.user),
+        ),
     }
     return render(request, 'posts/follow.html', context)
 
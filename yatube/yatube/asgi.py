@@ -0,0 +1,23 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``. Requests are served by the WSGI application in a
+thread pool of ASGI_THREADS threads, e.g.::
+
+    uvicorn yatube.asgi:application --workers 4
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import BoundedWsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = BoundedWsgiToAsgi(get_wsgi_application())
+
+from core.template_backend import warm_up  # noqa: E402
+
+warm_up()